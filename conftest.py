@@ -1,5 +1,86 @@
 
+import os
 import pytest
+import yaml
+from utils.drift_utils import configure_drift, drift_profiles, drift_report
+from utils.report_utils import save_json_report
+from utils.resilience_utils import configure_resilience, get_latency_samples, get_resilience_stats, get_throughput
+from utils.slo_utils import evaluate_slos, load_baseline, update_baseline
+from utils.trace_utils import configure_tracing, write_trace
+
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+TRACING_CONFIG = config["tracing"]
+RESILIENCE_CONFIG = config["resilience"]
+SLO_CONFIG = config["slo"]
+DRIFT_CONFIG = config["drift"]
+REPORT_CONFIG = config["reporting"]
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--full-suite",
+        action="store_true",
+        default=False,
+        help="Evaluate every case instead of stopping once sequential tests are settled"
+    )
 
 def pytest_configure(config):
     config.option.htmlpath = 'reports/report.html'
+    configure_tracing(
+        enabled=TRACING_CONFIG["enabled"],
+        profile=TRACING_CONFIG["profile"],
+        profile_interval=TRACING_CONFIG["profile_interval_ms"] / 1000
+    )
+    configure_resilience(RESILIENCE_CONFIG)
+    configure_drift(
+        enabled=DRIFT_CONFIG["enabled"],
+        reference_profile=DRIFT_CONFIG["reference_profile"],
+        n_bins=DRIFT_CONFIG["n_bins"],
+        buffer_size=DRIFT_CONFIG["buffer_size"],
+        psi_threshold=DRIFT_CONFIG["psi_threshold"],
+        ks_threshold=DRIFT_CONFIG["ks_threshold"]
+    )
+
+def pytest_sessionfinish(session, exitstatus):
+    if TRACING_CONFIG["enabled"]:
+        write_trace(TRACING_CONFIG["output"])
+    stats = get_resilience_stats()
+    if stats:
+        save_json_report(stats, os.path.join(REPORT_CONFIG["output_dir"], "resilience_report.json"))
+    if SLO_CONFIG["enabled"]:
+        check_slos(session)
+    profiles = drift_profiles()
+    if profiles:
+        save_json_report(drift_report(), os.path.join(REPORT_CONFIG["output_dir"], "drift_report.json"))
+        save_json_report(profiles, os.path.join(REPORT_CONFIG["output_dir"], "drift_profile.json"))
+
+def check_slos(session):
+    """Compare latencies collected during the run with SLOs and the rolling baseline."""
+    # Only configured targets are judged and baselined (e.g. not stream-open latencies)
+    samples = {target: s for target, s in get_latency_samples().items() if target in SLO_CONFIG["targets"]}
+    if not samples:
+        return
+    baseline = load_baseline(SLO_CONFIG["baseline_path"])
+    results = evaluate_slos(
+        samples,
+        SLO_CONFIG["targets"],
+        baseline=baseline,
+        throughput=get_throughput(),
+        significance=SLO_CONFIG["significance"],
+        min_slowdown=SLO_CONFIG["min_slowdown"],
+        min_samples=SLO_CONFIG["min_samples"]
+    )
+    save_json_report(results, os.path.join(REPORT_CONFIG["output_dir"], "slo_report.json"))
+    if all(result["passed"] for result in results.values()):
+        # Only passing runs extend the baseline, so regressions do not become the norm;
+        # targets skipped for too few samples were not judged and are left out
+        judged = {target: s for target, s in samples.items() if not results[target].get("skipped")}
+        if judged:
+            update_baseline(SLO_CONFIG["baseline_path"], baseline, judged, SLO_CONFIG["baseline_runs"])
+    else:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+@pytest.fixture(scope="session")
+def full_suite(request):
+    """Whether sequential evaluation should cover the whole suite."""
+    return request.config.getoption("--full-suite")
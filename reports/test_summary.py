@@ -55,10 +55,28 @@ test_results = {
     }
 }
 
+# Reports written by conftest.py at the end of a test session
+SESSION_REPORTS = {
+    "resilience": "resilience_report.json",
+    "slo": "slo_report.json",
+    "drift": "drift_report.json",
+    "distributed": "distributed_report.json"
+}
+
+def load_session_reports():
+    """Load session reports that exist in the output directory."""
+    reports = {}
+    for key, filename in SESSION_REPORTS.items():
+        path = os.path.join(REPORT_CONFIG["output_dir"], filename)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                reports[key] = json.load(f)
+    return reports
+
 def generate_test_summary():
     """Generate and save JSON test summary."""
     output_path = os.path.join(REPORT_CONFIG["output_dir"], "test_summary.json")
-    save_json_report(test_results, output_path)
+    save_json_report({**test_results, **load_session_reports()}, output_path)
     print(f"Test summary saved to {output_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,133 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import pytest
+import json
+import threading
+import yaml
+from utils.distributed_utils import WorkQueue, enqueue_fixtures, run_worker, merge_results, merge_partials, finalize_metrics
+from utils.ml_utils import evaluate_classification
+from utils.nlp_utils import extract_entities, validate_entities
+
+# Load configuration
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+NLP_CONFIG = config["nlp"]
+
+# Load fixtures
+with open("tests/fixtures/nlp_fixtures.json", "r") as f:
+    NLP_FIXTURES = json.load(f)
+
+@pytest.fixture
+def queue(tmp_path):
+    """Provide an empty work queue in a temporary database."""
+    return WorkQueue(str(tmp_path / "queue.db"), lease_seconds=30)
+
+def test_distributed_nlp_evaluation(queue, tmp_path):
+    """Test that concurrent workers cover every unit once and merged metrics are exact."""
+    enqueue_fixtures(queue, ["nlp"], unit_size=1)
+    
+    workers = [
+        threading.Thread(target=run_worker, args=(WorkQueue(str(tmp_path / "queue.db")), config, f"worker-{i}", 0.1))
+        for i in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    summary = merge_results(queue, config)
+    single_node_f1 = [
+        validate_entities(extract_entities(
+            tc["text"],
+            model_name=NLP_CONFIG["entity_extraction"]["model"],
+            lexicons=NLP_CONFIG["entity_extraction"]["lexicons"],
+            use_model=NLP_CONFIG["entity_extraction"]["use_statistical_model"],
+            cache_path=NLP_CONFIG["entity_extraction"]["gazetteer_cache"]
+        ), tc["expected_entities"])["f1"]
+        for tc in NLP_FIXTURES
+    ]
+    
+    assert summary["units"] == {"done": len(NLP_FIXTURES)}, f"Unexpected unit states: {summary['units']}"
+    assert summary["complete"]
+    assert summary["nlp"]["cases"] == len(NLP_FIXTURES)
+    assert summary["nlp"]["f1"] == pytest.approx(sum(single_node_f1) / len(single_node_f1)), "Differs from single-node F1"
+    assert summary["nlp"]["f1"] >= NLP_CONFIG["entity_extraction"]["min_f1"], (
+        f"F1-score too low: {summary['nlp']['f1']}"
+    )
+
+def test_expired_lease_is_reclaimed(queue):
+    """Test that a unit leased by a dead worker is reclaimed and its late result discarded."""
+    queue.enqueue({"nlp": NLP_FIXTURES}, unit_size=len(NLP_FIXTURES))
+    queue.lease_seconds = -1  # Leases expire immediately
+    unit = queue.claim("dead-worker")
+    
+    reclaimed = queue.claim("live-worker")
+    
+    assert reclaimed is not None and reclaimed["id"] == unit["id"], "Expired lease was not reclaimed"
+    assert queue.complete(reclaimed["id"], "live-worker", "nlp", {"cases": 1})
+    assert not queue.complete(unit["id"], "dead-worker", "nlp", {"cases": 1}), "Stale result was accepted"
+    assert len(queue.results()) == 1
+
+def test_unit_fails_after_max_attempts(queue):
+    """Test that a unit whose lease keeps expiring is marked failed instead of reclaimed forever."""
+    queue.enqueue({"nlp": NLP_FIXTURES}, unit_size=len(NLP_FIXTURES))
+    queue.lease_seconds = -1  # Leases expire immediately
+    claims = [queue.claim(f"worker-{i}") for i in range(queue.max_attempts + 2)]
+    
+    assert all(unit is not None for unit in claims[:queue.max_attempts])
+    assert claims[queue.max_attempts:] == [None, None], "Exhausted unit was leased again"
+    assert queue.progress() == {"failed": 1}, f"Unexpected unit states: {queue.progress()}"
+
+def test_coordinator_refuses_non_empty_queue(queue):
+    """Test that enqueueing twice is rejected unless the queue is reset."""
+    first = enqueue_fixtures(queue, ["nlp"], unit_size=1)
+    with pytest.raises(RuntimeError):
+        enqueue_fixtures(queue, ["nlp"], unit_size=1)
+    second = enqueue_fixtures(queue, ["nlp"], unit_size=1, reset=True)
+    
+    assert first == second
+    assert queue.progress() == {"pending": len(NLP_FIXTURES)}, f"Unexpected unit states: {queue.progress()}"
+
+def test_merged_classification_matches_single_node():
+    """Test that merged ML partials are scored exactly like evaluate_classification on all cases."""
+    classification = config["ml"]["evaluation"]["classification"]
+    partials = [
+        {"adherence": {"label_true": [1, 0, 1], "label_pred": [1, 0, 0]}},
+        {"adherence": {"label_true": [0, 1], "label_pred": [1, 1]}}
+    ]
+    
+    merged = finalize_metrics("ml", merge_partials(*partials), config)["adherence"]
+    expected = evaluate_classification(
+        [1, 0, 1, 0, 1], [1, 0, 0, 1, 1],
+        classification["min_precision"], classification["min_recall"], classification["min_f1"]
+    )
+    
+    assert merged["cases"] == 5
+    assert all(merged[key] == pytest.approx(expected[key]) for key in ("precision", "recall", "f1")), merged
+    assert merged["f1_pass"] == expected["f1_pass"]
+
+def test_enqueue_is_all_or_nothing(queue):
+    """Test that a bad dataset leaves the queue untouched."""
+    with pytest.raises(KeyError):
+        enqueue_fixtures(queue, ["nlp", "missing"], unit_size=1)
+    
+    assert queue.progress() == {}, f"Partial enqueue: {queue.progress()}"
+
+def test_merge_refuses_incomplete_queue(queue):
+    """Test that merging waits for pending units unless explicitly allowed."""
+    queue.enqueue({"nlp": NLP_FIXTURES}, unit_size=1)
+    unit = queue.claim("worker")
+    queue.complete(unit["id"], "worker", "nlp", {"cases": 1, "precision_sum": 1.0, "recall_sum": 1.0,
+                                                  "f1_sum": 1.0, "intent_correct": 1})
+    
+    with pytest.raises(RuntimeError):
+        merge_results(queue, config)
+    summary = merge_results(queue, config, allow_incomplete=True)
+    
+    assert not summary["complete"] and summary["nlp"]["cases"] == 1
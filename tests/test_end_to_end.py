@@ -50,7 +50,13 @@ def test_end_to_end_flow(credentials):
     )
     
     # Step 2: Extract entities from chatbot response
-    extracted_entities = extract_entities(chatbot_response, NLP_CONFIG["entity_extraction"]["model"])
+    extracted_entities = extract_entities(
+        chatbot_response,
+        NLP_CONFIG["entity_extraction"]["model"],
+        lexicons=NLP_CONFIG["entity_extraction"]["lexicons"],
+        use_model=NLP_CONFIG["entity_extraction"]["use_statistical_model"],
+        cache_path=NLP_CONFIG["entity_extraction"]["gazetteer_cache"]
+    )
     assert any(
         e["text"] == expected_entities[0]["text"] and e["label"] == expected_entities[0]["label"]
         for e in extracted_entities
@@ -9,56 +9,191 @@
 import pytest
 import json
 import yaml
-from utils.llm_utils import query_chatbot, evaluate_llm_response
+from utils.llm_utils import (
+    query_chatbot, query_chatbot_streaming, evaluate_llm_response, evaluate_llm_responses_tiered, batch_similarity
+)
+from utils.compare_utils import compare_targets
 from config.credentials import get_credentials_manager
 
 # Load configuration
 with open("config/config.yaml", "r") as f:
     config = yaml.safe_load(f)
 LLM_CONFIG = config["llm"]
+COMPARISON_CONFIG = config["comparison"]
 
 # Load fixtures
 with open("tests/fixtures/llm_fixtures.json", "r") as f:
     LLM_FIXTURES = json.load(f)
+REFERENCE_CORPUS = [tc["expected_response"] for tc in LLM_FIXTURES]
 
 @pytest.fixture(scope="module")
 def credentials():
     """Provide credentials for tests."""
     return get_credentials_manager()
 
-@pytest.mark.parametrize("test_case", LLM_FIXTURES)
-def test_chatbot_response(test_case, credentials):
-    """Test chatbot response correctness and DeepEval metrics."""
-    query = test_case["query"]
-    expected_response = test_case["expected_response"]
-    context = test_case.get("context", None)
-    
-    # Query chatbot
-    response = query_chatbot(
-        query=query,
-        context=context,
-        lambda_function=LLM_CONFIG["lambda_function"],
-        api_key=credentials.get_openai_api_key()
+def query_case(test_case, api_key):
+    """Query the chatbot for a fixture, streaming when enabled in the config."""
+    streaming = LLM_CONFIG["streaming"]
+    if not streaming["enabled"]:
+        response = query_chatbot(
+            query=test_case["query"],
+            context=test_case.get("context", None),
+            lambda_function=LLM_CONFIG["lambda_function"],
+            api_key=api_key
+        )
+        return {"response": response, "ttft": None}
+    return query_chatbot_streaming(
+        query=test_case["query"],
+        context=test_case.get("context", None),
+        lambda_function=streaming["lambda_function"],
+        api_key=api_key,
+        expected_response=test_case["expected_response"],
+        stop_on_verdict=streaming["stop_on_verdict"]
     )
+
+@pytest.fixture(scope="module")
+def chatbot_results(credentials):
+    """Query the chatbot once per case and score all responses in one batch."""
+    outputs = [query_case(tc, credentials.get_openai_api_key()) for tc in LLM_FIXTURES]
+    responses = [output["response"] for output in outputs]
+    
+    # DeepEval metrics (clear-cut cases are decided by local scorers first)
+    tiered_config = LLM_CONFIG["evaluation"]["tiered"]
+    if tiered_config["enabled"]:
+        evaluations = evaluate_llm_responses_tiered(
+            [{**tc, "response": response or ""} for tc, response in zip(LLM_FIXTURES, responses)],
+            min_relevancy=LLM_CONFIG["evaluation"]["relevancy_threshold"],
+            max_hallucination=LLM_CONFIG["evaluation"]["hallucination_threshold"],
+            pass_similarity=tiered_config["pass_similarity"],
+            fail_similarity=tiered_config["fail_similarity"],
+            min_grounding=tiered_config["min_grounding"],
+            reference_corpus=REFERENCE_CORPUS
+        )
+    else:
+        evaluations = [
+            evaluate_llm_response(
+                query=tc["query"],
+                response=response,
+                context=tc.get("context", None),
+                min_relevancy=LLM_CONFIG["evaluation"]["relevancy_threshold"],
+                max_hallucination=LLM_CONFIG["evaluation"]["hallucination_threshold"]
+            )
+            for tc, response in zip(LLM_FIXTURES, responses)
+        ]
+    return list(zip(outputs, evaluations))
+
+@pytest.mark.parametrize("index", range(len(LLM_FIXTURES)))
+def test_chatbot_response(index, chatbot_results):
+    """Test chatbot response correctness, time-to-first-token when streaming, and DeepEval metrics."""
+    expected_response = LLM_FIXTURES[index]["expected_response"]
+    output, results = chatbot_results[index]
+    response = output["response"]
     
     # Functional validation
     assert response is not None, "Chatbot returned no response"
     assert expected_response.lower() in response.lower(), (
         f"Expected '{expected_response}' in response, got '{response}'"
     )
-    
-    # DeepEval metrics
-    results = evaluate_llm_response(
-        query=query,
-        response=response,
-        context=context,
-        min_relevancy=LLM_CONFIG["evaluation"]["relevancy_threshold"],
-        max_hallucination=LLM_CONFIG["evaluation"]["hallucination_threshold"]
-    )
+    if LLM_CONFIG["streaming"]["enabled"]:
+        assert output["ttft"] is not None, "Chatbot stream returned no chunks"
+        assert output["ttft"] <= LLM_CONFIG["streaming"]["max_ttft_seconds"], (
+            f"Time to first token too high: {output['ttft']:.3f}s"
+        )
     
     assert results["relevancy_pass"], f"Relevancy score too low: {results['relevancy_score']}"
     assert results["hallucination_pass"], f"Hallucination score too high: {results['hallucination_score']}"
 
+def test_streaming_verdicts(monkeypatch):
+    """Test streamed verdicts across chunk boundaries, early stopping and forbidden phrases."""
+    consumed = []
+    def fake_stream(chunks):
+        def _stream(query, context=None, lambda_function=None, api_key=None):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+        return _stream
+    expected = "You are eligible for a rebate"
+    
+    # Expected phrase split across three chunks
+    monkeypatch.setattr("utils.llm_utils.stream_chatbot", fake_stream(["Good news: you are eli", "gible for a ", "Rebate on ibuprofen", " today."]))
+    early = query_chatbot_streaming("q", expected_response=expected)
+    assert early["verdict"] and early["stopped_early"], early
+    assert consumed == ["Good news: you are eli", "gible for a ", "Rebate on ibuprofen"], "Stream was not closed on verdict"
+    
+    consumed.clear()
+    full = query_chatbot_streaming("q", expected_response=expected, stop_on_verdict=False)
+    assert full["verdict"] and not full["stopped_early"] and full["chunks"] == 4
+    assert full["response"] == "Good news: you are eligible for a Rebate on ibuprofen today."
+    assert full["ttft"] is not None and len(full["inter_token_latencies"]) == 3
+    
+    monkeypatch.setattr("utils.llm_utils.stream_chatbot", fake_stream(["You are not ", "eligible."]))
+    forbidden = query_chatbot_streaming("q", expected_response=expected, forbidden_responses=["not eligible"])
+    assert forbidden["verdict"] is False and forbidden["stopped_early"], forbidden
+    
+    missing = query_chatbot_streaming("q", expected_response=expected)
+    assert missing["verdict"] is False and not missing["stopped_early"], missing
+
+def test_tiered_evaluation_local_tiers(monkeypatch):
+    """Test that exact and unrelated responses are decided locally and negated ones reach the judge."""
+    tiered_config = LLM_CONFIG["evaluation"]["tiered"]
+    judged = []
+    def fake_judge(query, response, **kwargs):
+        judged.append(response)
+        return {"relevancy_score": 0.0, "hallucination_score": 1.0, "relevancy_pass": False, "hallucination_pass": False}
+    monkeypatch.setattr("utils.llm_utils.evaluate_llm_response", fake_judge)
+    negated = {**LLM_FIXTURES[0], "response": "You are not eligible for a rebate on ibuprofen"}
+    cases = [
+        {**tc, "response": tc["expected_response"] + "."} for tc in LLM_FIXTURES
+    ] + [
+        {**tc, "response": "Today's forecast is sunny with light winds"} for tc in LLM_FIXTURES
+    ] + [negated]
+    
+    results = evaluate_llm_responses_tiered(
+        cases,
+        pass_similarity=tiered_config["pass_similarity"],
+        fail_similarity=tiered_config["fail_similarity"],
+        min_grounding=tiered_config["min_grounding"],
+        reference_corpus=REFERENCE_CORPUS
+    )
+    
+    n = len(LLM_FIXTURES)
+    assert all(r["tier"] == "exact" and r["relevancy_pass"] for r in results[:n]), results[:n]
+    assert all(r["tier"] == "local" and not r["relevancy_pass"] for r in results[n:2 * n]), results[n:2 * n]
+    assert results[-1]["tier"] == "judge" and judged == [negated["response"]], f"Negated response passed locally: {results[-1]}"
+
+def test_similarity_independent_of_batch():
+    """Test that a pair's similarity does not depend on the other cases in its batch."""
+    response = "Good news: you are eligible for a rebate on ibuprofen this month"
+    expected = REFERENCE_CORPUS[0]
+    others = [tc["query"] for tc in LLM_FIXTURES]
+    
+    alone = batch_similarity([response], [expected], REFERENCE_CORPUS)[0]
+    batched = batch_similarity([response] + others, [expected] + REFERENCE_CORPUS, REFERENCE_CORPUS)[0]
+    
+    assert alone == pytest.approx(batched), f"Similarity changed with the batch: {alone} vs {batched}"
+
+@pytest.mark.skipif(len(COMPARISON_CONFIG["lambda_functions"]) < 2, reason="No chatbot aliases to compare")
+def test_chatbot_alias_comparison(credentials):
+    """Test candidate chatbot Lambda aliases against the baseline on shared queries."""
+    api_key = credentials.get_openai_api_key()
+    
+    results = compare_targets(
+        LLM_FIXTURES,
+        {alias: (lambda case, alias=alias: query_chatbot(
+            query=case["query"], context=case.get("context"), lambda_function=alias, api_key=api_key
+        )) for alias in COMPARISON_CONFIG["lambda_functions"]},
+        lambda case, response: float(case["expected_response"].lower() in (response or "").lower()),
+        agree_fn=lambda a, b: (a or "").strip().lower() == (b or "").strip().lower(),
+        max_workers=COMPARISON_CONFIG["max_workers"],
+        significance=COMPARISON_CONFIG["significance"]
+    )
+    
+    for alias, comparison in results["comparisons"].items():
+        assert not comparison["regression"], (
+            f"{alias} is significantly worse than {comparison['baseline']}: "
+            f"delta {comparison['mean_delta']:.3f}, p={comparison['p_value']:.4f}"
+        )
+
 def test_chatbot_edge_cases(credentials):
     """Test chatbot with malformed or out-of-scope inputs."""
     edge_cases = [
@@ -9,13 +9,20 @@
 import pytest
 import json
 import yaml
-from utils.ml_utils import invoke_sagemaker_endpoint, evaluate_classification, evaluate_regression
+import numpy as np
+from sklearn.metrics import precision_recall_fscore_support
+from utils.ml_utils import invoke_sagemaker_endpoint, evaluate_classification, evaluate_regression, sweep_thresholds
+from utils.compare_utils import compare_targets
+from utils.drift_utils import FeatureDriftMonitor, compare_to_reference
+from utils.sequential_utils import evaluate_sequentially
 from config.credentials import get_credentials_manager
 
 # Load configuration
 with open("config/config.yaml", "r") as f:
     config = yaml.safe_load(f)
 ML_CONFIG = config["ml"]
+SEQUENTIAL_CONFIG = config["sequential"]
+COMPARISON_CONFIG = config["comparison"]
 
 # Load fixtures
 with open("tests/fixtures/ml_fixtures.json", "r") as f:
@@ -80,4 +87,131 @@ def test_risk_score_model(test_case, credentials):
     )
     
     assert results["mse_pass"], f"MSE too high: {results['mse']}"
-    assert results["r2_pass"], f"R2 too low: {results['r2']}"
\ No newline at end of file
+    assert results["r2_pass"], f"R2 too low: {results['r2']}"
+
+def test_sagemaker_suite(full_suite, credentials):
+    """Test suite-level prediction accuracy across endpoints with sequential early stopping."""
+    suite = ML_CONFIG["evaluation"]["suite"]
+    def case_correct(test_case):
+        endpoint = ML_CONFIG["sagemaker_endpoints"][test_case["model"]]
+        prediction = invoke_sagemaker_endpoint(endpoint, test_case["input"])["prediction"]
+        if "expected_label" in test_case:
+            return prediction == test_case["expected_label"]
+        return abs(prediction - test_case["expected_score"]) < suite["score_tolerance"]
+    
+    results = evaluate_sequentially(
+        ML_FIXTURES,
+        case_correct,
+        threshold=suite["min_accuracy"],
+        error_rate=SEQUENTIAL_CONFIG["error_rate"],
+        batch_size=SEQUENTIAL_CONFIG["batch_size"],
+        stratify_by="model",
+        seed=SEQUENTIAL_CONFIG["seed"],
+        exhaustive=full_suite or not SEQUENTIAL_CONFIG["enabled"]
+    )
+    
+    assert results["passed"], (
+        f"Suite accuracy too low: {results['estimate']:.3f} "
+        f"over {results['evaluated']}/{results['total']} cases"
+    )
+
+def test_threshold_sweep():
+    """Test vectorized threshold sweep against sklearn and the configured minimums."""
+    classification = ML_CONFIG["evaluation"]["classification"]
+    rng = np.random.default_rng(0)
+    y_true = rng.random(2000) < 0.3
+    scores = np.stack([
+        np.clip(0.6 * y_true + 0.5 * rng.random(2000), 0, 1),  # separable model
+        rng.random(2000)                                        # uninformative model
+    ])
+    
+    results = sweep_thresholds(
+        y_true, scores,
+        min_precision=classification["min_precision"],
+        min_recall=classification["min_recall"],
+        min_f1=classification["min_f1"]
+    )
+    
+    for i in [0, 300, 500, 800]:
+        threshold = results["thresholds"][i]
+        precision, recall, f1, _ = precision_recall_fscore_support(
+            y_true, scores[0] >= threshold, average="binary", zero_division=0
+        )
+        assert np.isclose(results["precision"][0, i], precision), f"Precision mismatch at {threshold}"
+        assert np.isclose(results["recall"][0, i], recall), f"Recall mismatch at {threshold}"
+        assert np.isclose(results["f1"][0, i], f1), f"F1-score mismatch at {threshold}"
+    
+    assert results["best_threshold"][0] is not None, "No threshold meets the classification minimums"
+    assert results["best_precision"][0] >= classification["min_precision"]
+    assert results["best_recall"][0] >= classification["min_recall"]
+    assert results["best_threshold"][1] is None, "Uninformative model should not meet the minimums"
+
+def test_drift_monitor():
+    """Test streaming drift monitor merges batches and flags a shifted feature."""
+    rng = np.random.default_rng(0)
+    n_features = len(ML_FIXTURES[0]["input"]["features"])
+    reference = FeatureDriftMonitor(n_bins=config["drift"]["n_bins"])
+    reference.update(rng.normal(size=(50000, n_features)))
+    profile = reference.to_profile()
+    
+    current = rng.normal(size=(20000, n_features))
+    current[:, 0] += 1.0
+    monitor = FeatureDriftMonitor(edges=profile["edges"], buffer_size=256)
+    shard = FeatureDriftMonitor(edges=profile["edges"], buffer_size=256)
+    monitor.update(current[:10000])
+    for row in current[10000:].tolist():
+        shard.observe(row)
+    monitor.merge(shard)
+    
+    results = compare_to_reference(
+        monitor, profile,
+        psi_threshold=config["drift"]["psi_threshold"],
+        ks_threshold=config["drift"]["ks_threshold"]
+    )
+    
+    assert results["n"] == len(current), f"Expected {len(current)} rows, got {results['n']}"
+    assert results["drifted_features"] == [0], f"Expected drift only in feature 0, got {results}"
+
+def test_drift_monitor_drops_malformed_rows():
+    """Test drift monitor counts and drops rows that do not match its width."""
+    monitor = FeatureDriftMonitor(n_bins=config["drift"]["n_bins"], buffer_size=4)
+    rows = [[1.0, 2.0, 3.0], [1.0, 2.0], [[1.0, 2.0], [3.0]], [1.0, float("nan"), 3.0], "abc"]
+    rows += [[float(i), 2.0 * i, 3.0 * i] for i in range(8)]
+    kept = [monitor.observe(row) for row in rows]
+    profile = monitor.to_profile()
+    
+    assert kept[:5] == [True, False, False, False, False], f"Unexpected acceptance: {kept}"
+    assert monitor.rejected == 4, f"Expected 4 rejected rows, got {monitor.rejected}"
+    assert profile["n"] == 9, f"Expected 9 binned rows, got {profile['n']}"
+    
+    rejected_only = FeatureDriftMonitor(edges=[[0.0], [1.0]])
+    rejected_only.observe([1.0])
+    assert rejected_only.to_profile() == {"n": 0}, "Empty profile should not report infinite bounds"
+
+@pytest.mark.parametrize("model", list(COMPARISON_CONFIG["sagemaker_endpoints"]))
+def test_endpoint_comparison(model, credentials):
+    """Test candidate SageMaker endpoints against the baseline on shared inputs."""
+    endpoints = COMPARISON_CONFIG["sagemaker_endpoints"][model]
+    cases = [tc for tc in ML_FIXTURES if tc["model"] == model]
+    
+    def score(case, response):
+        if "expected_label" in case:
+            return float(response["prediction"] == case["expected_label"])
+        return 1.0 - min(abs(response["prediction"] - case["expected_score"]), 1.0)
+    
+    results = compare_targets(
+        cases,
+        {endpoint: (lambda case, endpoint=endpoint: invoke_sagemaker_endpoint(endpoint, case["input"]))
+         for endpoint in endpoints},
+        score,
+        agree_fn=lambda a, b: a is not None and b is not None and a["prediction"] == b["prediction"],
+        max_workers=COMPARISON_CONFIG["max_workers"],
+        significance=COMPARISON_CONFIG["significance"]
+    )
+    
+    for endpoint, comparison in results["comparisons"].items():
+        assert not comparison["regression"], (
+            f"{endpoint} is significantly worse than {comparison['baseline']}: "
+            f"delta {comparison['mean_delta']:.3f}, p={comparison['p_value']:.4f}, "
+            f"disagreements on cases {comparison['disagreements']}"
+        )
@@ -8,13 +8,16 @@
 
 import pytest
 import json
+import pickle
 import yaml
-from utils.nlp_utils import extract_entities, validate_entities, detect_intent
+from utils.nlp_utils import extract_entities, validate_entities, detect_intent, load_gazetteer
+from utils.sequential_utils import evaluate_sequentially
 
 # Load configuration
 with open("config/config.yaml", "r") as f:
     config = yaml.safe_load(f)
 NLP_CONFIG = config["nlp"]
+SEQUENTIAL_CONFIG = config["sequential"]
 
 # Load fixtures
 with open("tests/fixtures/nlp_fixtures.json", "r") as f:
@@ -27,7 +30,13 @@ def test_entity_extraction(test_case):
     expected_entities = test_case["expected_entities"]
     
     # Extract entities
-    extracted_entities = extract_entities(text, model_name=NLP_CONFIG["entity_extraction"]["model"])
+    extracted_entities = extract_entities(
+        text,
+        model_name=NLP_CONFIG["entity_extraction"]["model"],
+        lexicons=NLP_CONFIG["entity_extraction"]["lexicons"],
+        use_model=NLP_CONFIG["entity_extraction"]["use_statistical_model"],
+        cache_path=NLP_CONFIG["entity_extraction"]["gazetteer_cache"]
+    )
     
     # Validate entities
     results = validate_entities(extracted_entities, expected_entities)
@@ -42,6 +51,46 @@ def test_entity_extraction(test_case):
         f"F1-score too low: {results['f1']}"
     )
 
+def test_corrupt_gazetteer_cache_is_rebuilt(tmp_path):
+    """Test that a truncated gazetteer cache is rebuilt instead of failing extraction."""
+    cache_path = tmp_path / "gazetteer.pkl"
+    cache_path.write_bytes(b"\x80\x05truncated")
+    
+    nlp, matcher = load_gazetteer(NLP_CONFIG["entity_extraction"]["lexicons"], str(cache_path))
+    
+    assert len(matcher) > 0, "Rebuilt gazetteer has no patterns"
+    with open(cache_path, "rb") as f:
+        assert "digest" in pickle.load(f), "Cache was not rewritten"
+    assert [p.name for p in tmp_path.iterdir()] == ["gazetteer.pkl"], "Temporary cache file left behind"
+
+def test_entity_extraction_suite(full_suite):
+    """Test suite-level entity F1 with sequential early stopping."""
+    def case_f1(test_case):
+        extracted = extract_entities(
+            test_case["text"],
+            model_name=NLP_CONFIG["entity_extraction"]["model"],
+            lexicons=NLP_CONFIG["entity_extraction"]["lexicons"],
+            use_model=NLP_CONFIG["entity_extraction"]["use_statistical_model"],
+            cache_path=NLP_CONFIG["entity_extraction"]["gazetteer_cache"]
+        )
+        return validate_entities(extracted, test_case["expected_entities"])["f1"]
+    
+    results = evaluate_sequentially(
+        NLP_FIXTURES,
+        case_f1,
+        threshold=NLP_CONFIG["entity_extraction"]["min_f1"],
+        error_rate=SEQUENTIAL_CONFIG["error_rate"],
+        batch_size=SEQUENTIAL_CONFIG["batch_size"],
+        stratify_by="expected_intent",
+        seed=SEQUENTIAL_CONFIG["seed"],
+        exhaustive=full_suite or not SEQUENTIAL_CONFIG["enabled"]
+    )
+    
+    assert results["passed"], (
+        f"Mean F1-score too low: {results['estimate']:.3f} "
+        f"over {results['evaluated']}/{results['total']} cases"
+    )
+
 @pytest.mark.parametrize("test_case", NLP_FIXTURES)
 def test_intent_detection(test_case):
     """Test intent detection from text."""
@@ -0,0 +1,139 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import pytest
+import threading
+import time
+import yaml
+from botocore.exceptions import ClientError
+from utils.resilience_utils import (
+    CircuitBreaker, CircuitOpenError, call_with_resilience, configure_resilience, get_resilience_stats,
+    reset_resilience
+)
+
+# Load configuration
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+RESILIENCE_CONFIG = config["resilience"]
+
+NO_DELAY = {"base_delay_seconds": 0.0, "throttle_base_delay_seconds": 0.0}
+FAKE_TARGETS = ["fake-retry", "fake-breaker", "fake-budget", "fake-hedge"]
+
+@pytest.fixture(autouse=True)
+def restore_policies():
+    """Restore the configured policies and drop fake targets from reports after each test."""
+    yield
+    configure_resilience(RESILIENCE_CONFIG)
+    reset_resilience(FAKE_TARGETS)
+
+def flaky(failures, error_factory):
+    """Return a callable that raises ``failures`` errors before succeeding."""
+    calls = []
+    def _call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error_factory()
+        return "ok"
+    _call.calls = calls
+    return _call
+
+def throttling_error():
+    return ClientError({"Error": {"Code": "ThrottlingException"}}, "Invoke")
+
+def test_retry_saves_call():
+    """Test that a transient error is retried and counted as a retry save."""
+    configure_resilience({"targets": {"fake-retry": NO_DELAY}})
+    func = flaky(2, TimeoutError)
+
+    assert call_with_resilience("fake-retry", func) == "ok"
+    stats = get_resilience_stats()["fake-retry"]
+    assert len(func.calls) == 3
+    assert stats["retries"] == 2 and stats["retry_saves"] == 1, f"Unexpected stats: {stats}"
+
+def test_breaker_counts_calls_not_attempts():
+    """Test that retries within one call and throttling do not open the circuit."""
+    configure_resilience({"targets": {"fake-breaker": {**NO_DELAY, "failure_threshold": 2, "retry_budget_burst": 100}}})
+
+    assert call_with_resilience("fake-breaker", flaky(2, TimeoutError)) == "ok"
+    for _ in range(3):
+        with pytest.raises(ClientError):
+            call_with_resilience("fake-breaker", flaky(3, throttling_error))
+    assert call_with_resilience("fake-breaker", flaky(0, TimeoutError)) == "ok"
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            call_with_resilience("fake-breaker", flaky(3, TimeoutError))
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience("fake-breaker", flaky(0, TimeoutError))
+    assert get_resilience_stats()["fake-breaker"]["circuit_rejections"] == 1
+
+def test_retry_budget_limits_retries_across_calls():
+    """Test that the shared retry budget stops retries once spent."""
+    policy = {**NO_DELAY, "retry_budget_ratio": 0.0, "retry_budget_burst": 2, "failure_threshold": 100}
+    configure_resilience({"targets": {"fake-budget": policy}})
+    funcs = [flaky(3, TimeoutError) for _ in range(2)]
+    for func in funcs:
+        with pytest.raises(TimeoutError):
+            call_with_resilience("fake-budget", func)
+
+    assert [len(func.calls) for func in funcs] == [3, 1], "Retries exceeded the budget"
+    assert get_resilience_stats()["fake-budget"]["retry_budget_exhausted"] == 1
+
+def test_breaker_half_open_allows_single_trial():
+    """Test that a half-open circuit admits one trial caller and closes on its success."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow(), "Circuit should be open"
+    time.sleep(0.06)
+
+    admitted = []
+    barrier = threading.Barrier(5)
+    def caller():
+        allowed = breaker.allow()
+        admitted.append(allowed)
+        barrier.wait()
+        if allowed:
+            breaker.record_success()
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert admitted.count(True) == 1, f"Expected one trial call, got {admitted}"
+    assert breaker.allow() and breaker.allow(), "Circuit should close after a successful trial"
+
+def test_breaker_failed_trial_reopens():
+    """Test that a failed half-open trial re-opens the circuit."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow(), "Circuit should re-open after a failed trial"
+
+def test_hedge_wins_against_slow_primary():
+    """Test that a hedged duplicate answers when the primary request stalls."""
+    configure_resilience({"targets": {"fake-hedge": {"hedge": True, "hedge_min_samples": 5}}})
+    for _ in range(5):
+        call_with_resilience("fake-hedge", lambda: "ok")
+
+    calls = []
+    lock = threading.Lock()
+    def slow_first():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(1.0)
+            return "slow"
+        return "fast"
+
+    assert call_with_resilience("fake-hedge", slow_first) == "fast"
+    stats = get_resilience_stats()["fake-hedge"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1, f"Unexpected stats: {stats}"
@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import pytest
+import numpy as np
+import yaml
+from utils.sequential_utils import confidence_radius, evaluate_sequentially
+
+# Load configuration
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+SEQUENTIAL_CONFIG = config["sequential"]
+
+def synthetic_cases(pass_rate, total=1000, seed=0):
+    """Cases with a precomputed 0/1 score and two strata."""
+    rng = np.random.default_rng(seed)
+    return [{"id": i, "group": i % 2, "score": float(rng.random() < pass_rate)} for i in range(total)]
+
+@pytest.mark.parametrize("pass_rate, expected", [(0.95, True), (0.05, False)])
+def test_stops_early_on_clear_decision(pass_rate, expected):
+    """Test that a clear pass or fail stops early with a bound that excludes the threshold."""
+    cases = synthetic_cases(pass_rate)
+    evaluated = []
+    def score(case):
+        evaluated.append(case["id"])
+        return case["score"]
+    
+    results = evaluate_sequentially(
+        cases, score, threshold=0.5,
+        error_rate=SEQUENTIAL_CONFIG["error_rate"],
+        batch_size=SEQUENTIAL_CONFIG["batch_size"],
+        stratify_by="group",
+        seed=SEQUENTIAL_CONFIG["seed"]
+    )
+    
+    population_mean = np.mean([case["score"] for case in cases])
+    assert results["passed"] is expected and results["stopped_early"], results["evaluated"]
+    assert results["evaluated"] == len(evaluated) == len(set(evaluated)) < len(cases) // 10
+    assert results["lower"] <= population_mean <= results["upper"], "Bound excludes the population mean"
+    assert results["lower"] > 0.5 if expected else results["upper"] < 0.5
+
+def test_exhaustive_covers_every_case():
+    """Test that exhaustive mode evaluates each case exactly once."""
+    cases = synthetic_cases(0.95, total=95)
+    evaluated = []
+    
+    results = evaluate_sequentially(
+        cases, lambda case: evaluated.append(case["id"]) or case["score"],
+        threshold=0.5, batch_size=10, stratify_by="group", exhaustive=True
+    )
+    
+    assert sorted(evaluated) == list(range(len(cases))), "Cases skipped or repeated"
+    assert results["evaluated"] == results["total"] == len(cases) and not results["stopped_early"]
+    assert results["estimate"] == pytest.approx(np.mean([case["score"] for case in cases]))
+    assert results["lower"] == results["upper"] == results["estimate"], "Full census should have zero radius"
+
+@pytest.mark.parametrize("error_rate, expected", [(0.02, True), (0.9, False)])
+def test_direction_max(error_rate, expected):
+    """Test that with direction='max' the suite passes when the mean score stays below the threshold."""
+    cases = synthetic_cases(error_rate)
+    
+    results = evaluate_sequentially(cases, lambda case: case["score"], threshold=0.2, direction="max", batch_size=20)
+    
+    assert results["passed"] is expected and results["stopped_early"], results
+    with pytest.raises(ValueError):
+        evaluate_sequentially(cases, lambda case: case["score"], threshold=0.2, direction="above")
+
+def test_confidence_radius_shrinks():
+    """Test that the radius shrinks with more samples and more total looks widen it."""
+    assert confidence_radius(100, 1000, 0.05, 1) < confidence_radius(10, 1000, 0.05, 1)
+    assert confidence_radius(10, 1000, 0.05, 5) > confidence_radius(10, 1000, 0.05, 1)
+    assert confidence_radius(1000, 1000, 0.05, 3) == 0.0
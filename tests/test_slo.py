@@ -0,0 +1,75 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import pytest
+import time
+import yaml
+import numpy as np
+from utils.resilience_utils import (
+    call_with_resilience, configure_resilience, get_latency_samples, get_throughput, reset_resilience
+)
+from utils.slo_utils import evaluate_slos, mann_whitney_greater
+
+# Load configuration
+with open("config/config.yaml", "r") as f:
+    config = yaml.safe_load(f)
+
+def test_mann_whitney_matches_scipy():
+    """Test the one-sided Mann-Whitney p-value against SciPy, with and without ties."""
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(0)
+    samples = [
+        (rng.lognormal(0.1, 0.3, 40), rng.lognormal(0.0, 0.3, 60)),
+        (np.round(rng.normal(1.0, 0.2, 30), 1), np.round(rng.normal(1.0, 0.2, 50), 1))
+    ]
+    for current, baseline in samples:
+        expected = stats.mannwhitneyu(current, baseline, alternative="greater", method="asymptotic").pvalue
+        assert mann_whitney_greater(current, baseline) == pytest.approx(expected, rel=1e-9)
+
+def test_evaluate_slos_flags_regression_and_percentiles():
+    """Test SLO percentile checks, baseline regressions and skipping of sparse targets."""
+    rng = np.random.default_rng(1)
+    history = [rng.normal(0.100, 0.005, 50).tolist() for _ in range(3)]
+    samples = {
+        "steady": rng.normal(0.100, 0.005, 50).tolist(),
+        "slower": rng.normal(0.130, 0.005, 50).tolist(),
+        "sparse": [5.0]
+    }
+    slo_targets = {"steady": {"p95_ms": 150}, "slower": {"p95_ms": 150}, "sparse": {"p95_ms": 150}, "tight": {"p99_ms": 50}}
+    baseline = {"steady": history, "slower": history}
+
+    results = evaluate_slos(samples, slo_targets, baseline=baseline, throughput={"steady": 5.0},
+                            significance=0.01, min_slowdown=0.1, min_samples=5)
+
+    assert results["steady"]["passed"] and not results["steady"]["regression"]
+    assert results["slower"]["p95_ms_pass"], "Slower target still meets its absolute SLO"
+    assert results["slower"]["regression"] and not results["slower"]["passed"], f"Missed regression: {results['slower']}"
+    assert results["sparse"]["skipped"] and results["tight"]["skipped"]
+
+def test_latency_includes_retries_and_streams_are_separate(monkeypatch):
+    """Test that recorded latency covers backoff and that stream opens use their own key."""
+    monkeypatch.setattr("utils.resilience_utils.backoff_delay", lambda attempt, throttled, policy: 0.05)
+    configure_resilience({"targets": {"fake-slo": {"failure_threshold": 100}}})
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimeoutError()
+        return "ok"
+
+    call_with_resilience("fake-slo", flaky)
+    call_with_resilience("fake-slo", lambda: time.sleep(0.01), latency_key="fake-slo:stream")
+    samples = get_latency_samples()
+    throughput = get_throughput()
+    configure_resilience(config["resilience"])
+    reset_resilience(["fake-slo", "fake-slo:stream"])
+
+    assert len(attempts) == 2 and len(samples["fake-slo"]) == 1
+    assert samples["fake-slo"][0] >= 0.05, f"Backoff missing from latency: {samples['fake-slo']}"
+    assert len(samples["fake-slo:stream"]) == 1, "Stream open was not recorded under its own key"
+    assert throughput["fake-slo:stream"] == pytest.approx(1.0 / samples["fake-slo:stream"][0], rel=0.2)
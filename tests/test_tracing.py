@@ -0,0 +1,85 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import pytest
+import json
+import time
+from utils import trace_utils
+from utils.trace_utils import SamplingProfiler, current_span, span, traced, write_trace
+
+@pytest.fixture
+def tracing(monkeypatch):
+    """Enable tracing into a private event list, restoring the session's tracing state afterwards."""
+    events = []
+    monkeypatch.setattr(trace_utils, "_events", events)
+    monkeypatch.setattr(trace_utils, "_enabled", True)
+    monkeypatch.setattr(trace_utils, "_profiler", None)
+    return events
+
+@traced()
+def fetch(payload):
+    """Stand-in for a traced utils entry point."""
+    current_span().set(request_bytes=len(payload))
+    current_span().incr("retries")
+    with span("cache_lookup") as lookup:
+        lookup.incr("cache_hits", 2)
+    return payload.upper()
+
+def test_disabled_tracing_is_noop(monkeypatch):
+    """Test that spans and attributes are discarded while tracing is disabled."""
+    events = []
+    monkeypatch.setattr(trace_utils, "_events", events)
+    monkeypatch.setattr(trace_utils, "_enabled", False)
+    
+    assert fetch("abc") == "ABC"
+    current_span().set(request_bytes=1)
+    
+    assert events == [], f"Spans recorded while disabled: {events}"
+    assert current_span().attributes == {}, "No-op span kept attributes"
+
+def test_span_nesting_and_attributes(tracing):
+    """Test that nested spans and their counters and payload sizes are recorded."""
+    assert fetch("abcd") == "ABCD"
+    
+    inner, outer = tracing
+    assert (inner["name"], outer["name"]) == ("cache_lookup", "fetch")
+    assert outer["args"] == {"request_bytes": 4, "retries": 1}
+    assert inner["args"] == {"cache_hits": 2}
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"], "Span not nested"
+    assert current_span() is trace_utils._NULL_SPAN, "Active span leaked after exit"
+
+def test_span_records_errors(tracing):
+    """Test that a failing call is still recorded with its error type."""
+    with pytest.raises(KeyError):
+        with span("lookup"):
+            raise KeyError("missing")
+    
+    assert tracing[0]["args"] == {"error": "KeyError"}
+
+def test_write_trace_chrome_format(tracing, tmp_path):
+    """Test that write_trace produces Chrome trace JSON and the profiler's folded stacks."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    trace_utils._profiler = profiler
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        fetch("x" * 100)
+    
+    output_path = write_trace(str(tmp_path / "trace.json"))
+    with open(output_path, "r") as f:
+        trace = json.load(f)
+    folded = (tmp_path / "trace.folded").read_text().splitlines()
+    
+    assert trace["traceEvents"], "No events written"
+    for event in trace["traceEvents"]:
+        assert event["ph"] == "X" and event["name"] in ("fetch", "cache_lookup")
+        assert isinstance(event["ts"], float) and event["dur"] >= 0
+        assert isinstance(event["pid"], int) and isinstance(event["tid"], int)
+    assert folded, "Profiler wrote no samples"
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded), f"Malformed folded line in {folded[:3]}"
+    assert any("fetch (test_tracing.py" in line for line in folded), "Traced function missing from samples"
@@ -7,49 +7,98 @@
 # This file is part of the GenAI QA Eval Framework.
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+import functools
+import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import os
+from utils.resilience_utils import call_with_resilience, get_policy
+from utils.trace_utils import traced, current_span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_aws_client(service: str, region: str = "us-east-1") -> Any:
-    """Initialize AWS client with secure credentials."""
+@functools.lru_cache(maxsize=None)
+def _create_client(
+    service: str,
+    region: str,
+    timeout: Optional[float],
+    access_key: Optional[str],
+    secret_key: Optional[str]
+) -> Any:
+    session = boto3.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region
+    )
+    if timeout is None:
+        return session.client(service)
+    # Retries are handled by utils.resilience_utils, so botocore makes a single attempt
+    config = Config(
+        connect_timeout=timeout,
+        read_timeout=timeout,
+        retries={"total_max_attempts": 1, "mode": "standard"}
+    )
+    return session.client(service, config=config)
+
+def get_aws_client(service: str, region: str = "us-east-1", timeout: Optional[float] = None) -> Any:
+    """Initialize AWS client with secure credentials (shared per service, region and timeout)."""
     try:
-        session = boto3.Session(
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=region
+        return _create_client(
+            service,
+            region,
+            timeout,
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY")
         )
-        return session.client(service)
     except Exception as e:
         logger.error(f"Failed to initialize AWS client for {service}: {str(e)}")
         raise
 
+@traced()
 def invoke_lambda(function_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Invoke AWS Lambda function."""
+    """Invoke AWS Lambda function with timeouts, retries and circuit breaking."""
     try:
-        lambda_client = get_aws_client("lambda")
-        response = lambda_client.invoke(
-            FunctionName=function_name,
-            InvocationType="RequestResponse",
-            Payload=json.dumps(payload)
-        )
-        return json.loads(response["Payload"].read().decode("utf-8"))
+        lambda_client = get_aws_client("lambda", timeout=get_policy(function_name)["timeout_seconds"])
+        body = json.dumps(payload)
+
+        def _invoke() -> Dict[str, Any]:
+            response = lambda_client.invoke(
+                FunctionName=function_name,
+                InvocationType="RequestResponse",
+                Payload=body
+            )
+            response_body = response["Payload"].read()
+            current_span().set(target=function_name, request_bytes=len(body), response_bytes=len(response_body))
+            return json.loads(response_body.decode("utf-8"))
+
+        return call_with_resilience(function_name, _invoke)
     except ClientError as e:
         logger.error(f"Lambda invocation failed: {str(e)}")
         raise
 
+@traced()
 def invoke_api_gateway(api_url: str, payload: Dict[str, Any], headers: Dict[str, str] = None) -> Dict[str, Any]:
     """Invoke API Gateway endpoint (placeholder for custom implementation)."""
     try:
         import requests
-        response = requests.post(api_url, json=payload, headers=headers or {})
-        response.raise_for_status()
-        return response.json()
+        timeout = get_policy(api_url)["timeout_seconds"]
+
+        def _invoke() -> Dict[str, Any]:
+            response = requests.post(api_url, json=payload, headers=headers or {}, timeout=timeout)
+            current_span().set(
+                target=api_url,
+                request_bytes=len(response.request.body or b""),
+                response_bytes=len(response.content),
+                status_code=response.status_code
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return call_with_resilience(api_url, _invoke)
     except Exception as e:
         logger.error(f"API Gateway invocation failed: {str(e)}")
         raise
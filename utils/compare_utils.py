@@ -0,0 +1,119 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from utils.slo_utils import average_ranks
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def mcnemar_exact(baseline_correct: np.ndarray, candidate_correct: np.ndarray) -> float:
+    """Two-sided exact McNemar p-value for paired pass/fail outcomes."""
+    b = int(np.sum(baseline_correct & ~candidate_correct))
+    c = int(np.sum(~baseline_correct & candidate_correct))
+    n = b + c
+    if n == 0:
+        return 1.0
+    tail = sum(math.comb(n, k) for k in range(min(b, c) + 1)) / 2.0 ** n
+    return min(1.0, 2.0 * tail)
+
+def wilcoxon_signed_rank(deltas: np.ndarray) -> float:
+    """Two-sided Wilcoxon signed-rank p-value (normal approximation, zeros dropped)."""
+    deltas = deltas[deltas != 0]
+    n = len(deltas)
+    if n == 0:
+        return 1.0
+    ranks, counts = average_ranks(np.abs(deltas))
+    w_plus = ranks[deltas > 0].sum()
+    mean = n * (n + 1) / 4.0
+    variance = n * (n + 1) * (2 * n + 1) / 24.0 - float(np.sum(counts ** 3 - counts)) / 48.0
+    if variance <= 0:
+        return 1.0
+    z = (w_plus - mean) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+def compare_targets(
+    cases: List[Dict[str, Any]],
+    targets: Dict[str, Callable[[Dict[str, Any]], Any]],
+    score_fn: Callable[[Dict[str, Any], Any], float],
+    agree_fn: Optional[Callable[[Any, Any], bool]] = None,
+    max_workers: int = 8,
+    significance: float = 0.05
+) -> Dict[str, Any]:
+    """Fan each case out concurrently to every target and compare them pairwise.
+
+    The first target is the baseline. ``targets`` maps a name to a callable
+    taking a case and returning the target's output; ``score_fn`` scores an
+    output for a case (failed calls score 0). Candidates are compared with
+    the exact McNemar test when all scores are 0/1 and the Wilcoxon
+    signed-rank test otherwise. Cases whose outputs disagree with the
+    baseline (per ``agree_fn``, default equality) are listed per candidate.
+    """
+    try:
+        names = list(targets)
+        agree_fn = agree_fn or (lambda a, b: a == b)
+
+        def _call(name: str, case: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return {"output": targets[name](case), "error": None}
+            except Exception as e:
+                return {"output": None, "error": f"{type(e).__name__}: {str(e)}"}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [[executor.submit(_call, name, case) for name in names] for case in cases]
+            outcomes = [[future.result() for future in row] for row in futures]
+
+        scores = np.array([
+            [score_fn(case, outcome["output"]) if outcome["error"] is None else 0.0 for outcome in row]
+            for case, row in zip(cases, outcomes)
+        ], dtype=float).reshape(len(cases), len(names))
+
+        binary = bool(np.isin(scores, (0.0, 1.0)).all())
+        baseline = names[0]
+        comparisons = {}
+        for j, name in enumerate(names[1:], start=1):
+            deltas = scores[:, j] - scores[:, 0]
+            if binary:
+                p_value = mcnemar_exact(scores[:, 0] == 1.0, scores[:, j] == 1.0)
+            else:
+                p_value = wilcoxon_signed_rank(deltas)
+            mean_delta = float(deltas.mean()) if len(deltas) else 0.0
+            comparisons[name] = {
+                "baseline": baseline,
+                "mean_score": float(scores[:, j].mean()) if len(cases) else 0.0,
+                "mean_delta": mean_delta,
+                "p_value": p_value,
+                "test": "mcnemar" if binary else "wilcoxon",
+                "significant": p_value < significance,
+                "regression": p_value < significance and mean_delta < 0,
+                "disagreements": [
+                    i for i, row in enumerate(outcomes)
+                    if row[0]["error"] is not None or row[j]["error"] is not None
+                    or not agree_fn(row[0]["output"], row[j]["output"])
+                ]
+            }
+
+        results = {
+            "targets": names,
+            "cases": len(cases),
+            "mean_scores": {name: float(scores[:, j].mean()) if len(cases) else 0.0 for j, name in enumerate(names)},
+            "errors": {name: sum(row[j]["error"] is not None for row in outcomes) for j, name in enumerate(names)},
+            "comparisons": comparisons,
+            "outputs": [[outcome["output"] for outcome in row] for row in outcomes]
+        }
+        summary = {name: (c["mean_delta"], c["p_value"]) for name, c in comparisons.items()}
+        logger.info(f"Compared {names} on {len(cases)} cases (mean delta, p-value): {summary}")
+        return results
+    except Exception as e:
+        logger.error(f"Target comparison failed: {str(e)}")
+        raise
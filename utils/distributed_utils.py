@@ -0,0 +1,434 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+"""Coordinator/worker evaluation over a shared SQLite work queue.
+
+    python -m utils.distributed_utils coordinator --db /shared/eval.db
+    python -m utils.distributed_utils worker --db /shared/eval.db      # on any number of machines
+    python -m utils.distributed_utils merge --db /shared/eval.db
+
+SQLite relies on file locks, so shared storage must support them (e.g. NFSv4
+with locking enabled).
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+import yaml
+from utils.llm_utils import query_chatbot, evaluate_llm_response, evaluate_llm_responses_tiered
+from utils.ml_utils import invoke_sagemaker_endpoint, evaluate_classification, evaluate_regression
+from utils.nlp_utils import extract_entities, validate_entities, detect_intent
+from utils.report_utils import save_json_report
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIXTURE_FILES = {
+    "llm": "tests/fixtures/llm_fixtures.json",
+    "nlp": "tests/fixtures/nlp_fixtures.json",
+    "ml": "tests/fixtures/ml_fixtures.json"
+}
+
+class WorkQueue:
+    """Leased work units and their partial results in a SQLite database."""
+
+    def __init__(self, db_path: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit; write transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS units (
+                id INTEGER PRIMARY KEY,
+                dataset TEXT NOT NULL,
+                cases TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS units_status ON units (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                unit_id INTEGER PRIMARY KEY REFERENCES units (id),
+                dataset TEXT NOT NULL,
+                worker TEXT NOT NULL,
+                result TEXT NOT NULL
+            );
+        """)
+
+    def _write(self, statements: Callable[[sqlite3.Cursor], Any]) -> Any:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                value = statements(cursor)
+                cursor.execute("COMMIT")
+                return value
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def enqueue(
+        self,
+        datasets: Dict[str, List[Dict[str, Any]]],
+        unit_size: int = 50,
+        reset: bool = False
+    ) -> Dict[str, int]:
+        """Split each dataset's cases into work units; returns the units added per dataset.
+
+        The emptiness check and all inserts share one transaction, so two
+        coordinators cannot both enqueue. A queue that already holds units is
+        refused, since merging would double-count, unless ``reset`` clears it.
+        """
+        units = [
+            (dataset, json.dumps(cases[i:i + unit_size]))
+            for dataset, cases in datasets.items()
+            for i in range(0, len(cases), unit_size)
+        ]
+        def _enqueue(cursor: sqlite3.Cursor):
+            if reset:
+                cursor.execute("DELETE FROM results")
+                cursor.execute("DELETE FROM units")
+            elif cursor.execute("SELECT COUNT(*) FROM units").fetchone()[0]:
+                raise RuntimeError("Work queue already holds units; rerun the coordinator with --reset")
+            cursor.executemany("INSERT INTO units (dataset, cases) VALUES (?, ?)", units)
+        self._write(_enqueue)
+        return {dataset: sum(d == dataset for d, _ in units) for dataset in datasets}
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the next pending unit, reclaiming units whose lease has expired.
+
+        Expired units that already used ``max_attempts`` leases are marked failed
+        instead, so a unit that keeps crashing or hanging its worker cannot stall the run.
+        """
+        def _claim(cursor: sqlite3.Cursor) -> Optional[Dict[str, Any]]:
+            now = time.time()
+            cursor.execute(
+                "UPDATE units SET status = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                "error = COALESCE(error, 'Lease expired after ' || attempts || ' attempts') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = cursor.execute(
+                "SELECT id, dataset, cases FROM units "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE units SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker_id, now + self.lease_seconds, row[0])
+            )
+            return {"id": row[0], "dataset": row[1], "cases": json.loads(row[2])}
+        return self._write(_claim)
+
+    def renew(self, unit_id: int, worker_id: str) -> bool:
+        """Extend a lease still held by this worker."""
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE units SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (time.time() + self.lease_seconds, unit_id, worker_id)
+        ).rowcount == 1)
+
+    def complete(self, unit_id: int, worker_id: str, dataset: str, result: Dict[str, Any]) -> bool:
+        """Store a unit's partial result unless its lease was reclaimed by another worker."""
+        def _complete(cursor: sqlite3.Cursor) -> bool:
+            updated = cursor.execute(
+                "UPDATE units SET status = 'done' WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                (unit_id, worker_id)
+            ).rowcount
+            if updated:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO results (unit_id, dataset, worker, result) VALUES (?, ?, ?, ?)",
+                    (unit_id, dataset, worker_id, json.dumps(result))
+                )
+            return bool(updated)
+        return self._write(_complete)
+
+    def fail(self, unit_id: int, worker_id: str, error: str):
+        """Release a unit for retry, or mark it failed after ``max_attempts``."""
+        self._write(lambda cursor: cursor.execute(
+            "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_expires = NULL, error = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (self.max_attempts, error, unit_id, worker_id)
+        ))
+
+    def progress(self) -> Dict[str, int]:
+        """Number of units per status."""
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+
+    def results(self) -> List[Dict[str, Any]]:
+        """All stored partial results with their dataset."""
+        with self._lock:
+            rows = self.conn.execute("SELECT dataset, result FROM results ORDER BY unit_id").fetchall()
+        return [{"dataset": dataset, "result": json.loads(result)} for dataset, result in rows]
+
+def evaluate_llm_unit(cases: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Partial LLM metrics: pass counts and score sums for a unit."""
+    llm_config = config["llm"]
+    evaluation = llm_config["evaluation"]
+    tiered_config = evaluation["tiered"]
+    responses = [
+        query_chatbot(query=case["query"], context=case.get("context"), lambda_function=llm_config["lambda_function"])
+        for case in cases
+    ]
+    if tiered_config["enabled"]:
+        # IDF from the whole suite, so verdicts do not depend on how cases were split into units
+        with open(FIXTURE_FILES["llm"], "r") as f:
+            reference_corpus = [case["expected_response"] for case in json.load(f)]
+        results = evaluate_llm_responses_tiered(
+            [{**case, "response": response or ""} for case, response in zip(cases, responses)],
+            min_relevancy=evaluation["relevancy_threshold"],
+            max_hallucination=evaluation["hallucination_threshold"],
+            pass_similarity=tiered_config["pass_similarity"],
+            fail_similarity=tiered_config["fail_similarity"],
+            min_grounding=tiered_config["min_grounding"],
+            reference_corpus=reference_corpus
+        )
+    else:
+        results = [
+            {**evaluate_llm_response(
+                query=case["query"],
+                response=response,
+                context=case.get("context"),
+                min_relevancy=evaluation["relevancy_threshold"],
+                max_hallucination=evaluation["hallucination_threshold"]
+            ), "tier": "judge"}
+            for case, response in zip(cases, responses)
+        ]
+    return {
+        "cases": len(cases),
+        "expected_found": sum(
+            case["expected_response"].lower() in (response or "").lower() for case, response in zip(cases, responses)
+        ),
+        "relevancy_passed": sum(r["relevancy_pass"] for r in results),
+        "hallucination_passed": sum(r["hallucination_pass"] for r in results),
+        "relevancy_sum": sum(float(r["relevancy_score"]) for r in results),
+        "hallucination_sum": sum(float(r["hallucination_score"]) for r in results),
+        "judge_calls": sum(r["tier"] == "judge" for r in results)
+    }
+
+def evaluate_nlp_unit(cases: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Partial NLP metrics: sums of per-case ``validate_entities`` scores and intent hits."""
+    entity_config = config["nlp"]["entity_extraction"]
+    partial = {"cases": len(cases), "precision_sum": 0.0, "recall_sum": 0.0, "f1_sum": 0.0, "intent_correct": 0}
+    for case in cases:
+        extracted = extract_entities(
+            case["text"],
+            model_name=entity_config["model"],
+            lexicons=entity_config["lexicons"],
+            use_model=entity_config["use_statistical_model"],
+            cache_path=entity_config["gazetteer_cache"]
+        )
+        scores = validate_entities(extracted, case["expected_entities"])
+        for key in ("precision", "recall", "f1"):
+            partial[f"{key}_sum"] += float(scores[key])
+        intent = detect_intent(case["text"], model_name=config["nlp"]["intent_detection"]["model"])
+        partial["intent_correct"] += intent == case["expected_intent"]
+    return partial
+
+def evaluate_ml_unit(cases: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Partial ML results per model: expected and predicted values, scored when merged."""
+    endpoints = config["ml"]["sagemaker_endpoints"]
+    partial: Dict[str, Any] = {}
+    for case in cases:
+        prediction = invoke_sagemaker_endpoint(endpoints[case["model"]], case["input"])["prediction"]
+        kind = "label" if "expected_label" in case else "score"
+        pairs = partial.setdefault(case["model"], {f"{kind}_true": [], f"{kind}_pred": []})
+        pairs[f"{kind}_true"].append(case[f"expected_{kind}"])
+        pairs[f"{kind}_pred"].append(prediction)
+    return partial
+
+UNIT_HANDLERS = {
+    "llm": evaluate_llm_unit,
+    "nlp": evaluate_nlp_unit,
+    "ml": evaluate_ml_unit
+}
+
+def merge_partials(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum numeric fields and concatenate lists of two partial results, recursing into nested dicts."""
+    merged = dict(a)
+    for key, value in b.items():
+        if isinstance(value, dict):
+            merged[key] = merge_partials(merged.get(key, {}), value)
+        elif isinstance(value, list):
+            merged[key] = merged.get(key, []) + value
+        else:
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else 0.0
+
+def finalize_metrics(dataset: str, partial: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn merged counts into metrics and threshold checks."""
+    if dataset == "llm":
+        n = partial["cases"]
+        return {
+            **partial,
+            "expected_found_rate": _ratio(partial["expected_found"], n),
+            "relevancy_pass_rate": _ratio(partial["relevancy_passed"], n),
+            "hallucination_pass_rate": _ratio(partial["hallucination_passed"], n),
+            "mean_relevancy": _ratio(partial["relevancy_sum"], n),
+            "mean_hallucination": _ratio(partial["hallucination_sum"], n)
+        }
+    if dataset == "nlp":
+        # Means of per-case scores, as in the single-node suite check
+        thresholds = config["nlp"]["entity_extraction"]
+        n = partial["cases"]
+        precision, recall, f1 = (_ratio(partial[f"{key}_sum"], n) for key in ("precision", "recall", "f1"))
+        accuracy = _ratio(partial["intent_correct"], n)
+        return {
+            **partial,
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "intent_accuracy": accuracy,
+            "precision_pass": precision >= thresholds["min_precision"],
+            "recall_pass": recall >= thresholds["min_recall"],
+            "f1_pass": f1 >= thresholds["min_f1"],
+            "intent_accuracy_pass": accuracy >= config["nlp"]["intent_detection"]["min_accuracy"]
+        }
+    # Same metric definitions as the single-node tests (weighted classification averages)
+    classification = config["ml"]["evaluation"]["classification"]
+    regression = config["ml"]["evaluation"]["regression"]
+    metrics = {}
+    for model, pairs in partial.items():
+        if "score_true" in pairs:
+            y_true = pairs["score_true"]
+            scores = evaluate_regression(y_true, pairs["score_pred"], regression["max_mse"], regression["min_r2"])
+        else:
+            y_true = pairs["label_true"]
+            scores = evaluate_classification(
+                y_true, pairs["label_pred"],
+                classification["min_precision"], classification["min_recall"], classification["min_f1"]
+            )
+        metrics[model] = {
+            "cases": len(y_true),
+            **{key: bool(value) if key.endswith("_pass") else float(value) for key, value in scores.items()}
+        }
+    return metrics
+
+def enqueue_fixtures(queue: WorkQueue, datasets: List[str], unit_size: int, reset: bool = False) -> Dict[str, int]:
+    """Coordinator: split fixture datasets into work units.
+
+    All fixtures are read before anything is written, and the units go in as
+    one transaction, so a bad fixture or a second coordinator leaves the queue
+    untouched. A non-empty queue is refused unless ``reset`` clears it first.
+    """
+    cases = {}
+    for dataset in datasets:
+        with open(FIXTURE_FILES[dataset], "r") as f:
+            cases[dataset] = json.load(f)
+    added = queue.enqueue(cases, unit_size, reset=reset)
+    logger.info(f"Enqueued work units: {added}{' after clearing the queue' if reset else ''}")
+    return added
+
+def run_worker(
+    queue: WorkQueue,
+    config: Dict[str, Any],
+    worker_id: Optional[str] = None,
+    poll_interval: float = 5.0
+) -> int:
+    """Worker: process units until none are pending or leased; returns units completed."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    completed = 0
+    while True:
+        unit = queue.claim(worker_id)
+        if unit is None:
+            progress = queue.progress()
+            if not progress.get("pending") and not progress.get("leased"):
+                logger.info(f"Worker {worker_id} finished after {completed} units")
+                return completed
+            # Leased units may still expire and need reclaiming
+            time.sleep(poll_interval)
+            continue
+
+        # Heartbeat keeps the lease alive while the unit is being evaluated
+        stop = threading.Event()
+        def _heartbeat(unit_id: int = unit["id"]):
+            while not stop.wait(queue.lease_seconds / 3):
+                if not queue.renew(unit_id, worker_id):
+                    return
+        heartbeat = threading.Thread(target=_heartbeat, daemon=True)
+        heartbeat.start()
+        try:
+            result = UNIT_HANDLERS[unit["dataset"]](unit["cases"], config)
+            if queue.complete(unit["id"], worker_id, unit["dataset"], result):
+                completed += 1
+            else:
+                logger.warning(f"Lease on unit {unit['id']} was reclaimed; result discarded")
+        except Exception as e:
+            logger.error(f"Unit {unit['id']} failed: {str(e)}")
+            queue.fail(unit["id"], worker_id, f"{type(e).__name__}: {str(e)}")
+        finally:
+            stop.set()
+            heartbeat.join()
+
+def merge_results(queue: WorkQueue, config: Dict[str, Any], allow_incomplete: bool = False) -> Dict[str, Any]:
+    """Merge all partial results into per-dataset metrics.
+
+    Refuses while units are still pending or leased unless ``allow_incomplete``;
+    ``complete`` in the summary is True only when every unit is done.
+    """
+    progress = queue.progress()
+    in_flight = progress.get("pending", 0) + progress.get("leased", 0)
+    if in_flight and not allow_incomplete:
+        raise RuntimeError(f"{in_flight} work units are still pending or leased {progress}; "
+                           f"wait for the workers or merge with --allow-incomplete")
+    merged: Dict[str, Dict[str, Any]] = {}
+    for row in queue.results():
+        merged[row["dataset"]] = merge_partials(merged.get(row["dataset"], {}), row["result"])
+    summary = {dataset: finalize_metrics(dataset, partial, config) for dataset, partial in merged.items()}
+    summary["units"] = progress
+    summary["complete"] = set(progress) <= {"done"}
+    if not summary["complete"]:
+        logger.warning(f"Merged metrics cover only completed units: {progress}")
+    return summary
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Distributed evaluation over a shared SQLite work queue")
+    parser.add_argument("role", choices=["coordinator", "worker", "merge"])
+    parser.add_argument("--db", required=True, help="Path to the shared queue database")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--reset", action="store_true", help="Coordinator: clear existing units and results first")
+    parser.add_argument("--allow-incomplete", action="store_true",
+                        help="Merge: report metrics while units are still pending or leased")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r") as f:
+        config = yaml.safe_load(f)
+    settings = config["distributed"]
+    queue = WorkQueue(args.db, settings["lease_seconds"], settings["max_attempts"])
+
+    if args.role == "coordinator":
+        enqueue_fixtures(queue, settings["datasets"], settings["unit_size"], reset=args.reset)
+    elif args.role == "worker":
+        run_worker(queue, config, poll_interval=settings["poll_interval_seconds"])
+    else:
+        summary = merge_results(queue, config, allow_incomplete=args.allow_incomplete)
+        output_path = os.path.join(config["reporting"]["output_dir"], "distributed_report.json")
+        save_json_report(summary, output_path)
+        print(f"Distributed evaluation summary saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
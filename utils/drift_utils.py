@@ -0,0 +1,296 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PSI_EPSILON = 1e-4
+
+def reference_edges(X: Any, n_bins: int = 10) -> List[np.ndarray]:
+    """Per-feature quantile bin edges (inner edges only) from a sample of rows."""
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    quantiles = np.quantile(X, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0)
+    return [np.unique(quantiles[:, j]) for j in range(X.shape[1])]
+
+class FeatureDriftMonitor:
+    """Bounded-memory, mergeable per-feature histograms and moments for streamed rows.
+
+    Each feature keeps counts over fixed inner bin edges plus underflow and
+    overflow bins, and running count/mean/M2/min/max. Rows are buffered and
+    binned in vectorized batches; monitors with the same edges can be merged.
+    """
+
+    def __init__(self, edges: Optional[List[Any]] = None, n_bins: int = 10, buffer_size: int = 1024):
+        self.n_bins = n_bins
+        self.buffer_size = buffer_size
+        self.edges: Optional[List[np.ndarray]] = None
+        self.n_features: Optional[int] = None
+        self.rejected = 0
+        self._buffer: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        if edges is not None:
+            self._init_edges([np.asarray(e, dtype=float) for e in edges])
+
+    def _init_edges(self, edges: List[np.ndarray]):
+        d = len(edges)
+        self.edges = edges
+        self.n_features = d
+        self.counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in edges]
+        self.n = 0
+        self.mean = np.zeros(d)
+        self.m2 = np.zeros(d)
+        self.min = np.full(d, np.inf)
+        self.max = np.full(d, -np.inf)
+
+    def observe(self, features: List[float]) -> bool:
+        """Buffer one feature vector; bins are updated once the buffer is full.
+
+        Rows that are not a flat, finite vector of the monitor's width are
+        counted in ``rejected`` and dropped; returns whether the row was kept.
+        """
+        try:
+            row = np.asarray(features, dtype=float)
+        except (TypeError, ValueError):
+            row = None
+        with self._lock:
+            if (row is None or row.ndim != 1 or len(row) == 0 or not np.isfinite(row).all()
+                    or (self.n_features is not None and len(row) != self.n_features)):
+                self.rejected += 1
+                return False
+            if self.n_features is None:
+                # No reference: the first row fixes the width until edges are set
+                self.n_features = len(row)
+            self._buffer.append(row)
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+            return True
+
+    def update(self, X: Any):
+        """Add a batch of rows (n_rows, n_features)."""
+        with self._lock:
+            self._update(np.atleast_2d(np.asarray(X, dtype=float)))
+
+    def flush(self):
+        """Bin any buffered rows."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            X = np.vstack(self._buffer)
+            self._buffer = []
+            self._update(X)
+
+    def _update(self, X: np.ndarray):
+        if len(X) == 0:
+            return
+        if self.edges is None:
+            # No reference: fix edges from the first batch
+            self._init_edges(reference_edges(X, self.n_bins))
+        if X.shape[1] != len(self.edges):
+            raise ValueError(f"Expected {len(self.edges)} features, got {X.shape[1]}")
+        for j, edges in enumerate(self.edges):
+            bins = np.searchsorted(edges, X[:, j], side="right")
+            self.counts[j] += np.bincount(bins, minlength=len(edges) + 1)
+        self._merge_moments(len(X), X.mean(axis=0), ((X - X.mean(axis=0)) ** 2).sum(axis=0),
+                            X.min(axis=0), X.max(axis=0))
+
+    def _merge_moments(self, n: int, mean: np.ndarray, m2: np.ndarray, low: np.ndarray, high: np.ndarray):
+        # Chan et al. parallel variance update
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total
+        self.n = total
+        self.min = np.minimum(self.min, low)
+        self.max = np.maximum(self.max, high)
+
+    def merge(self, other: "FeatureDriftMonitor"):
+        """Merge another monitor built on the same edges into this one."""
+        other.flush()
+        with self._lock:
+            self._flush()
+            if other.edges is None or other.n == 0:
+                return
+            if self.edges is None:
+                self._init_edges([e.copy() for e in other.edges])
+            if any(not np.array_equal(a, b) for a, b in zip(self.edges, other.edges)):
+                raise ValueError("Cannot merge monitors with different bin edges")
+            for j in range(len(self.edges)):
+                self.counts[j] += other.counts[j]
+            self._merge_moments(other.n, other.mean, other.m2, other.min, other.max)
+
+    def quantiles(self, qs: List[float]) -> np.ndarray:
+        """Approximate per-feature quantiles by interpolating within histogram bins."""
+        self.flush()
+        result = np.empty((len(self.edges), len(qs)))
+        for j, edges in enumerate(self.edges):
+            bounds = np.concatenate([[self.min[j]], np.clip(edges, self.min[j], self.max[j]), [self.max[j]]])
+            cdf = np.concatenate([[0.0], np.cumsum(self.counts[j]) / max(self.n, 1)])
+            result[j] = np.interp(qs, cdf, bounds)
+        return result
+
+    def to_profile(self) -> Dict[str, Any]:
+        """Serializable profile, usable as a reference for later runs."""
+        self.flush()
+        if self.edges is None or self.n == 0:
+            # No rows binned: min/max/quantiles would be infinite, which is not valid JSON
+            return {"n": 0}
+        return {
+            "n": int(self.n),
+            "edges": [e.tolist() for e in self.edges],
+            "counts": [c.tolist() for c in self.counts],
+            "mean": self.mean.tolist(),
+            "std": np.sqrt(self.m2 / max(self.n - 1, 1)).tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+            "quantiles": dict(zip(["p05", "p50", "p95"], self.quantiles([0.05, 0.5, 0.95]).T.tolist()))
+        }
+
+def _padded(counts: List[Any]) -> np.ndarray:
+    width = max(len(c) for c in counts)
+    matrix = np.zeros((len(counts), width))
+    for j, c in enumerate(counts):
+        matrix[j, :len(c)] = c
+    return matrix
+
+def drift_statistics(reference_counts: List[Any], current_counts: List[Any]) -> Dict[str, np.ndarray]:
+    """Per-feature PSI and KS distance between histograms on shared bins.
+
+    KS is evaluated at the bin edges, a lower bound on the exact statistic.
+    """
+    reference = _padded(reference_counts)
+    current = _padded(current_counts)
+    reference_p = reference / np.maximum(reference.sum(axis=1, keepdims=True), 1)
+    current_p = current / np.maximum(current.sum(axis=1, keepdims=True), 1)
+
+    ref_eps = np.maximum(reference_p, PSI_EPSILON)
+    cur_eps = np.maximum(current_p, PSI_EPSILON)
+    psi = np.sum((cur_eps - ref_eps) * np.log(cur_eps / ref_eps), axis=1)
+    ks = np.max(np.abs(np.cumsum(current_p, axis=1) - np.cumsum(reference_p, axis=1)), axis=1)
+    return {"psi": psi, "ks": ks}
+
+def compare_to_reference(
+    monitor: FeatureDriftMonitor,
+    profile: Dict[str, Any],
+    psi_threshold: float = 0.2,
+    ks_threshold: float = 0.1
+) -> Dict[str, Any]:
+    """Compare a monitor with a reference profile built on the same edges."""
+    try:
+        current = monitor.to_profile()
+        if current["n"] == 0:
+            return {"n": 0, "drift": False}
+        stats = drift_statistics(profile["counts"], current["counts"])
+        drifted = (stats["psi"] >= psi_threshold) | (stats["ks"] >= ks_threshold)
+        results = {
+            "n": current["n"],
+            "reference_n": profile["n"],
+            "psi": stats["psi"].tolist(),
+            "ks": stats["ks"].tolist(),
+            "drifted_features": np.flatnonzero(drifted).tolist(),
+            "drift": bool(drifted.any()),
+            "mean": current["mean"],
+            "reference_mean": profile["mean"]
+        }
+        if results["drift"]:
+            logger.warning(f"Feature drift in features {results['drifted_features']}: PSI {results['psi']}")
+        return results
+    except Exception as e:
+        logger.error(f"Drift comparison failed: {str(e)}")
+        raise
+
+_enabled = False
+_monitors: Dict[str, FeatureDriftMonitor] = {}
+_references: Dict[str, Dict[str, Any]] = {}
+_settings: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+
+def load_reference_profiles(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load per-endpoint reference profiles (as written by ``drift_profiles``)."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def configure_drift(
+    enabled: bool = False,
+    reference_profile: Optional[str] = None,
+    n_bins: int = 10,
+    buffer_size: int = 1024,
+    psi_threshold: float = 0.2,
+    ks_threshold: float = 0.1
+):
+    """Enable payload drift monitoring, binning each endpoint on its reference edges."""
+    global _enabled, _references
+    with _registry_lock:
+        _enabled = enabled
+        _references = load_reference_profiles(reference_profile) if enabled else {}
+        _settings.update(n_bins=n_bins, buffer_size=buffer_size,
+                         psi_threshold=psi_threshold, ks_threshold=ks_threshold)
+        _monitors.clear()
+    logger.info(f"Drift monitoring {'enabled' if enabled else 'disabled'} ({len(_references)} reference profiles)")
+
+def observe_payload(endpoint_name: str, payload: Dict[str, Any]):
+    """Record the ``features`` vector of a SageMaker payload.
+
+    Monitoring never fails the caller: malformed vectors are dropped and
+    counted per endpoint, and unexpected errors are logged.
+    """
+    if not _enabled or not isinstance(payload, dict) or "features" not in payload:
+        return
+    try:
+        _observe(endpoint_name, payload["features"])
+    except Exception as e:
+        logger.warning(f"Drift monitoring skipped a payload for {endpoint_name}: {str(e)}")
+
+def _observe(endpoint_name: str, features: Any):
+    monitor = _monitors.get(endpoint_name)
+    if monitor is None:
+        with _registry_lock:
+            monitor = _monitors.get(endpoint_name)
+            if monitor is None:
+                reference = _references.get(endpoint_name)
+                monitor = FeatureDriftMonitor(
+                    edges=reference["edges"] if reference else None,
+                    n_bins=_settings.get("n_bins", 10),
+                    buffer_size=_settings.get("buffer_size", 1024)
+                )
+                _monitors[endpoint_name] = monitor
+    if not monitor.observe(features):
+        logger.warning(
+            f"Dropped malformed feature vector for {endpoint_name} "
+            f"(expected {monitor.n_features} finite values; {monitor.rejected} dropped so far)"
+        )
+
+def drift_profiles() -> Dict[str, Dict[str, Any]]:
+    """Current per-endpoint profiles, to promote as the next reference (endpoints with rows only)."""
+    profiles = {endpoint: monitor.to_profile() for endpoint, monitor in _monitors.items()}
+    return {endpoint: profile for endpoint, profile in profiles.items() if profile["n"]}
+
+def drift_report() -> Dict[str, Dict[str, Any]]:
+    """Per-endpoint drift results against the reference profiles."""
+    report = {}
+    for endpoint, monitor in _monitors.items():
+        reference = _references.get(endpoint)
+        if reference is None:
+            report[endpoint] = {"n": monitor.to_profile()["n"], "drift": None, "reason": "no reference profile"}
+        else:
+            report[endpoint] = compare_to_reference(
+                monitor, reference, _settings["psi_threshold"], _settings["ks_threshold"]
+            )
+        report[endpoint]["rejected"] = monitor.rejected
+    return report
@@ -6,16 +6,24 @@
 # © 2025 Mahesh Mutukula. All rights reserved.
 # This file is part of the GenAI QA Eval Framework.
 
+import codecs
 import json
 import logging
-from typing import Optional, Dict, Any
+import re
+import time
+from typing import Optional, Dict, Any, Iterator, List
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from langchain.llms import OpenAI
 from deepeval import evaluate
 from deepeval.metrics import AnswerRelevancy, Hallucination
-import boto3
 from botocore.exceptions import ClientError
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+from utils.aws_utils import get_aws_client, invoke_lambda
+from utils.resilience_utils import call_with_resilience, get_policy
+from utils.trace_utils import traced, current_span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +42,7 @@ def initialize_llm_chain(api_key: str, model_name: str = "gpt-3.5-turbo") -> LLM
         logger.error(f"Failed to initialize LLM chain: {str(e)}")
         raise
 
+@traced()
 def query_chatbot(
     query: str,
     context: Optional[str] = None,
@@ -43,20 +52,15 @@ def query_chatbot(
     """Query the chatbot via Lambda or local LangChain."""
     try:
         if lambda_function:
-            # Invoke AWS Lambda function
-            lambda_client = boto3.client("lambda")
-            payload = {"query": query, "context": context or ""}
-            response = lambda_client.invoke(
-                FunctionName=lambda_function,
-                InvocationType="RequestResponse",
-                Payload=json.dumps(payload)
-            )
-            response_payload = json.loads(response["Payload"].read().decode("utf-8"))
+            # Invoke AWS Lambda function (timeouts, retries and circuit breaking per target)
+            response_payload = invoke_lambda(lambda_function, {"query": query, "context": context or ""})
             return response_payload.get("response", "")
         else:
             # Local LangChain query
             chain = initialize_llm_chain(api_key)
-            return chain.run(query=query, context=context or "")
+            answer = chain.run(query=query, context=context or "")
+            current_span().set(target="langchain", response_bytes=len(answer))
+            return answer
     except ClientError as e:
         logger.error(f"Lambda invocation failed: {str(e)}")
         raise
@@ -64,6 +68,155 @@ def query_chatbot(
         logger.error(f"Chatbot query failed: {str(e)}")
         raise
 
+def stream_chatbot(
+    query: str,
+    context: Optional[str] = None,
+    lambda_function: Optional[str] = None,
+    api_key: Optional[str] = None
+) -> Iterator[str]:
+    """Yield chatbot response chunks via Lambda response streaming or local LangChain.
+
+    The Lambda must stream the answer itself as UTF-8 text (e.g. via
+    ``awslambda.streamifyResponse``), not the ``{"response": ...}`` JSON
+    envelope that ``query_chatbot`` reads, since chunks are yielded as-is.
+    """
+    try:
+        if lambda_function:
+            # Invoke AWS Lambda function with response streaming
+            lambda_client = get_aws_client("lambda", timeout=get_policy(lambda_function)["timeout_seconds"])
+            payload = {"query": query, "context": context or ""}
+            # Only opening the stream is retried; chunks are never replayed
+            # Time to open the stream is not a full round-trip; keep it out of the target's SLO samples
+            response = call_with_resilience(
+                lambda_function,
+                lambda: lambda_client.invoke_with_response_stream(
+                    FunctionName=lambda_function,
+                    InvocationType="RequestResponse",
+                    Payload=json.dumps(payload)
+                ),
+                latency_key=f"{lambda_function}:stream"
+            )
+            event_stream = response["EventStream"]
+            # Chunks may split multi-byte characters
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                for event in event_stream:
+                    if "PayloadChunk" in event:
+                        text = decoder.decode(event["PayloadChunk"]["Payload"])
+                        if text:
+                            yield text
+                    elif "InvokeComplete" in event:
+                        error_code = event["InvokeComplete"].get("ErrorCode")
+                        if error_code:
+                            raise RuntimeError(
+                                f"Lambda stream failed: {error_code} "
+                                f"{event['InvokeComplete'].get('ErrorDetails', '')}"
+                            )
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+            finally:
+                # Closing releases the connection when the consumer stops early
+                event_stream.close()
+        else:
+            # Local LangChain streaming query
+            chain = initialize_llm_chain(api_key)
+            prompt = chain.prompt.format(query=query, context=context or "")
+            for chunk in chain.llm.stream(prompt):
+                if chunk:
+                    yield chunk
+    except ClientError as e:
+        logger.error(f"Lambda streaming invocation failed: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Chatbot streaming query failed: {str(e)}")
+        raise
+
+@traced()
+def query_chatbot_streaming(
+    query: str,
+    context: Optional[str] = None,
+    lambda_function: Optional[str] = None,
+    api_key: Optional[str] = None,
+    expected_response: Optional[str] = None,
+    forbidden_responses: Optional[List[str]] = None,
+    stop_on_verdict: bool = True
+) -> Dict[str, Any]:
+    """Stream a chatbot response, recording TTFT and inter-token latency.
+
+    The verdict is True once ``expected_response`` appears, False once any of
+    ``forbidden_responses`` appears (or the stream ends without a match), and
+    None when no expectation was given. With ``stop_on_verdict`` the stream is
+    closed as soon as the verdict is known.
+    """
+    expected = expected_response.lower() if expected_response else None
+    forbidden = [f.lower() for f in forbidden_responses or []]
+    # Only the last (longest needle - 1) characters can start a match spanning chunks
+    overlap = max([len(n) for n in forbidden + ([expected] if expected else [])] or [1]) - 1
+
+    chunks = []
+    inter_token_latencies = []
+    ttft = None
+    verdict = None
+    stopped_early = False
+    tail = ""
+
+    start = time.perf_counter()
+    last = start
+    stream = stream_chatbot(query, context, lambda_function, api_key)
+    try:
+        for chunk in stream:
+            now = time.perf_counter()
+            if ttft is None:
+                ttft = now - start
+            else:
+                inter_token_latencies.append(now - last)
+            last = now
+            chunks.append(chunk)
+
+            window = tail + chunk.lower()
+            if verdict is None:
+                if expected and expected in window:
+                    verdict = True
+                elif any(f in window for f in forbidden):
+                    verdict = False
+            tail = window[-overlap:] if overlap else ""
+
+            if verdict is not None and stop_on_verdict:
+                stopped_early = True
+                break
+    finally:
+        stream.close()
+
+    if verdict is None and expected:
+        verdict = False
+
+    results = {
+        "response": "".join(chunks),
+        "ttft": ttft,
+        "inter_token_latencies": inter_token_latencies,
+        "mean_inter_token_latency": (
+            sum(inter_token_latencies) / len(inter_token_latencies) if inter_token_latencies else None
+        ),
+        "total_latency": last - start,
+        "chunks": len(chunks),
+        "verdict": verdict,
+        "stopped_early": stopped_early
+    }
+    current_span().set(
+        target=lambda_function or "langchain",
+        ttft=ttft,
+        chunks=len(chunks),
+        response_bytes=len(results["response"]),
+        stopped_early=stopped_early
+    )
+    logger.debug(
+        "Streaming query finished: ttft=%s, chunks=%s, verdict=%s, stopped_early=%s",
+        ttft, len(chunks), verdict, stopped_early
+    )
+    return results
+
+@traced()
 def evaluate_llm_response(
     query: str,
     response: str,
@@ -85,8 +238,124 @@ def evaluate_llm_response(
             "relevancy_pass": relevancy_score >= min_relevancy,
             "hallucination_pass": hallucination_score <= max_hallucination
         }
-        logger.info(f"LLM evaluation results: {results}")
+        logger.debug("LLM evaluation results: %s", results)
         return results
     except Exception as e:
         logger.error(f"LLM evaluation failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+def normalize_text(text: str) -> str:
+    """Lowercase text, strip punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+def batch_similarity(
+    responses: List[str],
+    references: List[str],
+    corpus: Optional[List[str]] = None
+) -> np.ndarray:
+    """Cosine similarity of character n-gram TF-IDF vectors for paired texts.
+
+    IDF weights come from the fixed ``corpus`` (plain term frequencies when
+    omitted), never from the batch, so a pair scores the same whatever else
+    is in the batch. N-grams absent from the corpus get the maximum IDF.
+    """
+    try:
+        vectorizer = CountVectorizer(analyzer="char_wb", ngram_range=(3, 5))
+        counts = vectorizer.fit_transform([normalize_text(t) for t in responses + references]).astype(float)
+        if corpus:
+            document_counts = vectorizer.transform([normalize_text(t) for t in corpus])
+            document_frequency = np.asarray((document_counts > 0).sum(axis=0)).ravel()
+            # Smoothed IDF, as in scikit-learn's TfidfTransformer
+            counts = counts.multiply(np.log((1 + len(corpus)) / (1 + document_frequency)) + 1).tocsr()
+        vectors = normalize(counts)
+        n = len(responses)
+        # Rows are L2-normalized, so the row-wise dot product is the cosine similarity
+        return np.asarray(vectors[:n].multiply(vectors[n:]).sum(axis=1)).ravel()
+    except ValueError:
+        # Empty vocabulary (e.g. all texts blank)
+        return np.zeros(len(responses))
+
+def ngram_overlap(text: str, reference: str, n: int = 2) -> float:
+    """Fraction of word n-grams (up to ``n``) in text that also occur in reference."""
+    text_tokens = normalize_text(text).split()
+    reference_tokens = normalize_text(reference).split()
+    text_ngrams = set()
+    reference_ngrams = set()
+    for k in range(1, n + 1):
+        text_ngrams.update(zip(*[text_tokens[i:] for i in range(k)]))
+        reference_ngrams.update(zip(*[reference_tokens[i:] for i in range(k)]))
+    if not text_ngrams:
+        return 0.0
+    return len(text_ngrams & reference_ngrams) / len(text_ngrams)
+
+@traced()
+def evaluate_llm_responses_tiered(
+    cases: List[Dict[str, Any]],
+    min_relevancy: float = 0.8,
+    max_hallucination: float = 0.2,
+    pass_similarity: float = 0.9,
+    fail_similarity: float = 0.2,
+    min_grounding: float = 0.8,
+    reference_corpus: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Evaluate responses with cheap local scorers, escalating ambiguous cases to DeepEval.
+
+    Each case holds ``query``, ``response``, ``expected_response`` and optionally
+    ``context``. A case is decided locally when its normalized response matches
+    the expected one, or when it contains the expected response, is at least
+    ``pass_similarity`` similar to it and is grounded in the context and expected
+    response, or when its similarity is at most ``fail_similarity``. All other
+    cases go to ``evaluate_llm_response``: n-gram similarity cannot see a flipped
+    meaning ("not eligible"), so similarity alone never passes a case.
+    Similarity IDF weights come from ``reference_corpus`` (e.g. every expected
+    response in the suite), so verdicts do not depend on how cases are batched.
+    """
+    try:
+        responses = [case["response"] or "" for case in cases]
+        expected = [case["expected_response"] for case in cases]
+        similarities = batch_similarity(responses, expected, reference_corpus)
+
+        results = []
+        tiers = {"exact": 0, "local": 0, "judge": 0}
+        for case, similarity in zip(cases, similarities):
+            grounding = ngram_overlap(
+                case["response"], f"{case.get('context') or ''} {case['expected_response']}"
+            )
+            response_text = normalize_text(case["response"])
+            expected_text = normalize_text(case["expected_response"])
+            contains_expected = bool(expected_text) and f" {expected_text} " in f" {response_text} "
+            if response_text == expected_text:
+                tier, verdict, similarity, grounding = "exact", True, 1.0, 1.0
+            elif contains_expected and similarity >= pass_similarity and grounding >= min_grounding:
+                tier, verdict = "local", True
+            elif similarity <= fail_similarity:
+                tier, verdict = "local", False
+            else:
+                tier, verdict = "judge", None
+            tiers[tier] += 1
+
+            if verdict is None:
+                result = dict(evaluate_llm_response(
+                    query=case["query"],
+                    response=case["response"],
+                    context=case.get("context"),
+                    min_relevancy=min_relevancy,
+                    max_hallucination=max_hallucination
+                ))
+            else:
+                hallucination_score = 1.0 - grounding
+                result = {
+                    "relevancy_score": float(similarity),
+                    "hallucination_score": hallucination_score,
+                    "relevancy_pass": verdict,
+                    "hallucination_pass": verdict or hallucination_score <= max_hallucination
+                }
+            result.update({"tier": tier, "similarity": float(similarity), "grounding": grounding})
+            results.append(result)
+
+        current_span().set(cases=len(cases), **tiers)
+        logger.info(f"Tiered evaluation of {len(cases)} cases: {tiers}")
+        return results
+    except Exception as e:
+        logger.error(f"Tiered LLM evaluation failed: {str(e)}")
+        raise
@@ -6,33 +6,46 @@
 # © 2025 Mahesh Mutukula. All rights reserved.
 # This file is part of the GenAI QA Eval Framework.
 
-import boto3
-from typing import List, Dict, Any
-from sklearn.metrics import precision_recall_f1_score, mean_squared_error, r2_score
+from typing import List, Dict, Any, Optional
+from sklearn.metrics import precision_recall_fscore_support, mean_squared_error, r2_score
 import numpy as np
 import json
 import logging
+from utils.aws_utils import get_aws_client
+from utils.drift_utils import observe_payload
+from utils.resilience_utils import call_with_resilience, get_policy
+from utils.trace_utils import traced, current_span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@traced()
 def invoke_sagemaker_endpoint(endpoint_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """Invoke SageMaker endpoint with input payload."""
     try:
-        sagemaker = boto3.client("sagemaker-runtime")
-        response = sagemaker.invoke_endpoint(
-            EndpointName=endpoint_name,
-            ContentType="application/json",
-            Body=json.dumps(payload)
-        )
-        result = json.loads(response["Body"].read().decode("utf-8"))
-        logger.info(f"SageMaker response: {result}")
+        sagemaker = get_aws_client("sagemaker-runtime", timeout=get_policy(endpoint_name)["timeout_seconds"])
+        body = json.dumps(payload)
+
+        def _invoke() -> Dict[str, Any]:
+            response = sagemaker.invoke_endpoint(
+                EndpointName=endpoint_name,
+                ContentType="application/json",
+                Body=body
+            )
+            response_body = response["Body"].read()
+            current_span().set(target=endpoint_name, request_bytes=len(body), response_bytes=len(response_body))
+            return json.loads(response_body.decode("utf-8"))
+
+        result = call_with_resilience(endpoint_name, _invoke)
+        observe_payload(endpoint_name, payload)
+        logger.debug("SageMaker response: %s", result)
         return result
     except Exception as e:
         logger.error(f"SageMaker invocation failed: {str(e)}")
         raise
 
+@traced()
 def evaluate_classification(
     y_true: List[int],
     y_pred: List[int],
@@ -42,7 +55,7 @@ def evaluate_classification(
 ) -> Dict[str, float]:
     """Evaluate classification model performance."""
     try:
-        precision, recall, f1, _ = precision_recall_f1_score(y_true, y_pred, average="weighted")
+        precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average="weighted")
         results = {
             "precision": precision,
             "recall": recall,
@@ -51,12 +64,96 @@ def evaluate_classification(
             "recall_pass": recall >= min_recall,
             "f1_pass": f1 >= min_f1
         }
-        logger.info(f"Classification evaluation results: {results}")
+        logger.debug("Classification evaluation results: %s", results)
         return results
     except Exception as e:
         logger.error(f"Classification evaluation failed: {str(e)}")
         raise
 
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division that yields 0 where the denominator is 0."""
+    return np.divide(
+        numerator, denominator,
+        out=np.zeros(np.broadcast(numerator, denominator).shape),
+        where=denominator > 0
+    )
+
+@traced()
+def sweep_thresholds(
+    y_true: Any,
+    scores: Any,
+    thresholds: Optional[Any] = None,
+    min_precision: float = 0.85,
+    min_recall: float = 0.80,
+    min_f1: float = 0.82
+) -> Dict[str, Any]:
+    """Compute classification metrics for many models at every candidate threshold.
+
+    ``scores`` has shape (n_models, n_rows) (or (n_rows,) for one model) and
+    ``y_true`` holds binary labels, either shared (n_rows,) or per model. A row
+    is predicted positive when its score is >= the threshold. Each model is
+    sorted once; confusion counts at all thresholds then come from cumulative
+    label counts and a binary search, so cost is O(n log n + T log n) per model.
+    Returns (n_models, n_thresholds) metric arrays and, per model, the threshold
+    with the best F1 among those meeting all minimums (None if none does).
+    """
+    try:
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        labels = np.broadcast_to(np.atleast_2d(np.asarray(y_true)).astype(bool), scores.shape)
+        thresholds = np.linspace(0.0, 1.0, 1001) if thresholds is None else np.asarray(thresholds, dtype=float)
+        n_models, n_rows = scores.shape
+
+        order = np.argsort(scores, axis=1, kind="stable")
+        sorted_scores = np.take_along_axis(scores, order, axis=1)
+        sorted_labels = np.take_along_axis(labels, order, axis=1)
+        # Positives among the k lowest scores, for k = 0..n_rows
+        positives_below = np.zeros((n_models, n_rows + 1), dtype=np.int64)
+        np.cumsum(sorted_labels, axis=1, out=positives_below[:, 1:])
+
+        # Rows scored below each threshold are predicted negative
+        below = np.stack([
+            np.searchsorted(sorted_scores[m], thresholds, side="left") for m in range(n_models)
+        ])
+        total_positives = positives_below[:, -1:]
+        total_negatives = n_rows - total_positives
+        false_negatives = np.take_along_axis(positives_below, below, axis=1)
+        true_positives = total_positives - false_negatives
+        true_negatives = below - false_negatives
+        false_positives = total_negatives - true_negatives
+
+        precision = _safe_divide(true_positives, true_positives + false_positives)
+        recall = _safe_divide(true_positives, total_positives)
+        f1 = _safe_divide(2 * true_positives, 2 * true_positives + false_positives + false_negatives)
+        specificity = _safe_divide(true_negatives, total_negatives)
+
+        feasible = (precision >= min_precision) & (recall >= min_recall) & (f1 >= min_f1)
+        best_index = np.where(feasible, f1, -1.0).argmax(axis=1)
+        found = feasible[np.arange(n_models), best_index]
+
+        def _best(values: np.ndarray) -> List[Optional[float]]:
+            return [float(values[m, i]) if found[m] else None for m, i in enumerate(best_index)]
+
+        best_threshold = [float(thresholds[i]) if found[m] else None for m, i in enumerate(best_index)]
+
+        results = {
+            "thresholds": thresholds,
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+            "specificity": specificity,
+            "best_threshold": best_threshold,
+            "best_precision": _best(precision),
+            "best_recall": _best(recall),
+            "best_f1": _best(f1)
+        }
+        current_span().set(models=n_models, rows=n_rows, thresholds=len(thresholds))
+        logger.info(f"Threshold sweep over {n_models} models x {len(thresholds)} thresholds: {best_threshold}")
+        return results
+    except Exception as e:
+        logger.error(f"Threshold sweep failed: {str(e)}")
+        raise
+
+@traced()
 def evaluate_regression(
     y_true: List[float],
     y_pred: List[float],
@@ -73,7 +170,7 @@ def evaluate_regression(
             "mse_pass": mse <= max_mse,
             "r2_pass": r2 >= min_r2
         }
-        logger.info(f"Regression evaluation results: {results}")
+        logger.debug("Regression evaluation results: %s", results)
         return results
     except Exception as e:
         logger.error(f"Regression evaluation failed: {str(e)}")
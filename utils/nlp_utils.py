@@ -7,33 +7,154 @@
 # This file is part of the GenAI QA Eval Framework.
 
 import spacy
-from typing import List, Dict, Tuple
-from sklearn.metrics import precision_recall_f1_score
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+from typing import Any, List, Dict, Optional, Tuple
+from sklearn.metrics import precision_recall_fscore_support
+import functools
+import hashlib
 import logging
+import os
+import pickle
+import tempfile
+from utils.trace_utils import traced, current_span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ENTITY_LABELS = ["DRUG", "SYMPTOM", "DIAGNOSIS"]
+DEFAULT_LEXICONS = {
+    "DRUG": "config/lexicons/drug.txt",
+    "SYMPTOM": "config/lexicons/symptom.txt",
+    "DIAGNOSIS": "config/lexicons/diagnosis.txt"
+}
+DEFAULT_GAZETTEER_CACHE = ".cache/gazetteer.pkl"
+
+_gazetteers: Dict[Tuple, Tuple[spacy.language.Language, PhraseMatcher]] = {}
+
+@functools.lru_cache(maxsize=None)
 def load_nlp_model(model_name: str = "en_core_web_sm") -> spacy.language.Language:
-    """Load spaCy model for entity extraction."""
+    """Load spaCy model for entity extraction (once per process)."""
     try:
         return spacy.load(model_name)
     except Exception as e:
         logger.error(f"Failed to load spaCy model {model_name}: {str(e)}")
         raise
 
-def extract_entities(text: str, model_name: str = "en_core_web_sm") -> List[Dict[str, str]]:
-    """Extract medical entities from text using spaCy."""
+def read_lexicons(lexicons: Dict[str, str]) -> Dict[str, List[str]]:
+    """Read one term per line for each entity label, skipping blanks and # comments."""
+    terms = {}
+    for label, path in lexicons.items():
+        with open(path, "r") as f:
+            terms[label] = sorted({
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            })
+    return terms
+
+def build_gazetteer(terms: Dict[str, List[str]]) -> Tuple[spacy.language.Language, PhraseMatcher]:
+    """Compile lexicon terms into a case-insensitive PhraseMatcher on a tokenizer-only pipeline."""
+    nlp = spacy.blank("en")
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for label, label_terms in terms.items():
+        matcher.add(label, list(nlp.tokenizer.pipe(label_terms)))
+    return nlp, matcher
+
+def _write_gazetteer_cache(cache_path: str, cached: Dict[str, Any]):
+    """Pickle to a temporary file in the cache directory, then rename it into place."""
+    directory = os.path.dirname(cache_path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        # The cache only saves start-up time; extraction works without it
+        logger.warning(f"Could not write gazetteer cache {cache_path}: {str(e)}")
+
+def load_gazetteer(
+    lexicons: Optional[Dict[str, str]] = None,
+    cache_path: Optional[str] = DEFAULT_GAZETTEER_CACHE
+) -> Tuple[spacy.language.Language, PhraseMatcher]:
+    """Load the compiled gazetteer, rebuilding the on-disk cache when lexicons change.
+
+    An unreadable cache (truncated, or pickled by another spaCy version) is
+    rebuilt; the cache is replaced atomically so concurrent workers sharing a
+    checkout never read a partial file.
+    """
+    lexicons = lexicons or DEFAULT_LEXICONS
+    key = (tuple(sorted(lexicons.items())), cache_path)
+    if key in _gazetteers:
+        current_span().incr("cache_hits")
+        return _gazetteers[key]
+
+    try:
+        terms = read_lexicons(lexicons)
+        digest = hashlib.sha256(repr(sorted(terms.items())).encode("utf-8")).hexdigest()
+        gazetteer = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached.get("digest") == digest and cached.get("spacy_version") == spacy.__version__:
+                    gazetteer = (cached["nlp"], cached["matcher"])
+                    logger.info(f"Loaded gazetteer from {cache_path}")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable gazetteer cache {cache_path}: {str(e)}")
+        if gazetteer is None:
+            gazetteer = build_gazetteer(terms)
+            if cache_path:
+                _write_gazetteer_cache(cache_path, {
+                    "digest": digest,
+                    "spacy_version": spacy.__version__,
+                    "nlp": gazetteer[0],
+                    "matcher": gazetteer[1]
+                })
+            logger.info(f"Built gazetteer with {sum(len(t) for t in terms.values())} terms")
+        _gazetteers[key] = gazetteer
+        return gazetteer
+    except Exception as e:
+        logger.error(f"Failed to load gazetteer: {str(e)}")
+        raise
+
+def _merge_entities(gazetteer_spans: List[Any], model_ents: List[Any]) -> List[Dict[str, str]]:
+    """Combine gazetteer matches with non-overlapping statistical entities, in text order."""
+    taken = [(span.start_char, span.end_char) for span in gazetteer_spans]
+    merged = [(span.start_char, span.text, span.label_) for span in gazetteer_spans]
+    for ent in model_ents:
+        if all(ent.end_char <= start or ent.start_char >= end for start, end in taken):
+            merged.append((ent.start_char, ent.text, ent.label_))
+    return [{"text": text, "label": label} for _, text, label in sorted(merged)]
+
+@traced()
+def extract_entities(
+    text: str,
+    model_name: str = "en_core_web_sm",
+    lexicons: Optional[Dict[str, str]] = None,
+    use_model: bool = False,
+    cache_path: Optional[str] = DEFAULT_GAZETTEER_CACHE
+) -> List[Dict[str, str]]:
+    """Extract medical entities from text using the lexicon gazetteer.
+
+    The spaCy statistical model only runs when ``use_model`` is set; its
+    DRUG/SYMPTOM/DIAGNOSIS entities are added where they do not overlap a
+    gazetteer match.
+    """
     try:
-        nlp = load_nlp_model(model_name)
-        doc = nlp(text)
-        entities = [
-            {"text": ent.text, "label": ent.label_}
-            for ent in doc.ents
-            if ent.label_ in ["DRUG", "SYMPTOM", "DIAGNOSIS"]
-        ]
-        logger.info(f"Extracted entities: {entities}")
+        nlp, matcher = load_gazetteer(lexicons, cache_path)
+        doc = nlp.make_doc(text)
+        spans = filter_spans(matcher(doc, as_spans=True))
+        model_ents = []
+        if use_model:
+            model_ents = [ent for ent in load_nlp_model(model_name)(text).ents if ent.label_ in ENTITY_LABELS]
+        entities = _merge_entities(spans, model_ents)
+        current_span().set(text_bytes=len(text), entities=len(entities))
+        logger.debug("Extracted entities: %s", entities)
         return entities
     except Exception as e:
         logger.error(f"Entity extraction failed: {str(e)}")
@@ -55,9 +176,9 @@ def validate_entities(
             y_true.extend(["None"] * (max_len - len(y_true)))
             y_pred.extend(["None"] * (max_len - len(y_pred)))
         
-        precision, recall, f1, _ = precision_recall_f1_score(y_true, y_pred, average="weighted")
+        precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average="weighted")
         results = {"precision": precision, "recall": recall, "f1": f1}
-        logger.info(f"Entity validation results: {results}")
+        logger.debug("Entity validation results: %s", results)
         return results
     except Exception as e:
         logger.error(f"Entity validation failed: {str(e)}")
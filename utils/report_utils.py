@@ -10,8 +10,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import os
+import json
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List
 from sklearn.metrics import confusion_matrix
 
 # Configure logging
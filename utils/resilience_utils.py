@@ -0,0 +1,351 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+import numpy as np
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
+from utils.trace_utils import current_span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+}
+THROTTLING_STATUS_CODES = {429}
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+
+DEFAULT_POLICY = {
+    "timeout_seconds": 30.0,
+    "max_attempts": 3,
+    "base_delay_seconds": 0.1,
+    "throttle_base_delay_seconds": 0.5,
+    "max_delay_seconds": 5.0,
+    "retry_budget_ratio": 0.2,
+    "retry_budget_burst": 10,
+    "failure_threshold": 5,
+    "reset_timeout_seconds": 30.0,
+    "hedge": False,
+    "hedge_quantile": 0.95,
+    "hedge_min_samples": 20,
+}
+LATENCY_WINDOW = 1000
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the target's circuit is open."""
+
+class CircuitBreaker:
+    """Open after consecutive failed calls; allow one trial call after the reset timeout.
+
+    The trial belongs to the thread that was let through; its outcome closes
+    or re-opens the circuit, and other callers are rejected until then.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_owner: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_owner is None and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Half-open: let a single trial call through
+                self._trial_owner = threading.get_ident()
+                return True
+            return False
+
+    def _is_trial(self) -> bool:
+        return self._trial_owner is not None and self._trial_owner == threading.get_ident()
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None and not self._is_trial():
+                # A call admitted before the circuit opened; the trial decides
+                return
+            self._failures = 0
+            self._opened_at = None
+            self._trial_owner = None
+
+    def record_failure(self):
+        with self._lock:
+            if self._is_trial():
+                self._trial_owner = None
+                self._opened_at = time.monotonic()
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """End a call without a health verdict (e.g. throttled), freeing the trial slot."""
+        with self._lock:
+            if self._is_trial():
+                self._trial_owner = None
+
+class RetryBudget:
+    """Token bucket shared by all calls to a target: each call earns ``ratio`` retries."""
+
+    def __init__(self, ratio: float = 0.2, burst: int = 10):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = float(burst)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(float(self.burst), self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry token; returns False when the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+_defaults: Dict[str, Any] = dict(DEFAULT_POLICY)
+_target_overrides: Dict[str, Dict[str, Any]] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+_latencies: Dict[str, Deque[float]] = {}
+_attempt_latencies: Dict[str, Deque[float]] = {}
+_activity: Dict[str, list] = {}
+_stats: Dict[str, Counter] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+def configure_resilience(config: Optional[Dict[str, Any]] = None):
+    """Load default and per-target policies (the ``resilience`` section of config.yaml)."""
+    global _defaults, _target_overrides
+    config = config or {}
+    with _lock:
+        _defaults = {**DEFAULT_POLICY, **config.get("defaults", {})}
+        _target_overrides = dict(config.get("targets") or {})
+        _breakers.clear()
+        _budgets.clear()
+    logger.info(f"Resilience configured for {len(_target_overrides)} target overrides")
+
+def reset_resilience(targets: Optional[List[str]] = None):
+    """Forget breakers, budgets, counters and latency windows for targets (all when None).
+
+    ``targets`` may also hold latency keys such as ``"<lambda>:stream"``.
+    """
+    with _lock:
+        for state in (_breakers, _budgets, _stats, _latencies, _attempt_latencies, _activity):
+            if targets is None:
+                state.clear()
+            else:
+                for target in targets:
+                    state.pop(target, None)
+
+def get_policy(target: str) -> Dict[str, Any]:
+    """Return the resilience policy for a target (Lambda, endpoint name or URL)."""
+    return {**_defaults, **_target_overrides.get(target, {})}
+
+def _breaker(target: str, policy: Dict[str, Any]) -> CircuitBreaker:
+    with _lock:
+        if target not in _breakers:
+            _breakers[target] = CircuitBreaker(policy["failure_threshold"], policy["reset_timeout_seconds"])
+        return _breakers[target]
+
+def _budget(target: str, policy: Dict[str, Any]) -> RetryBudget:
+    with _lock:
+        if target not in _budgets:
+            _budgets[target] = RetryBudget(policy["retry_budget_ratio"], policy["retry_budget_burst"])
+        return _budgets[target]
+
+def _record(target: str, key: str, amount: int = 1):
+    with _lock:
+        _stats.setdefault(target, Counter())[key] += amount
+
+def get_latency_samples() -> Dict[str, list]:
+    """Return recent successful-call latencies (seconds) per latency key.
+
+    Latencies span the whole call, including failed attempts and backoff.
+    """
+    with _lock:
+        return {key: list(samples) for key, samples in _latencies.items()}
+
+def get_throughput() -> Dict[str, float]:
+    """Return successful calls per second of busy time per latency key.
+
+    Busy time is the time with at least one call in flight, so gaps between
+    tests do not count; sequential callers measure the rate at concurrency 1.
+    """
+    with _lock:
+        return {
+            key: completed / busy
+            for key, (_, _, busy, completed) in _activity.items()
+            if busy > 0
+        }
+
+def _enter(key: str):
+    with _lock:
+        activity = _activity.setdefault(key, [0, 0.0, 0.0, 0])
+        if activity[0] == 0:
+            activity[1] = time.perf_counter()
+        activity[0] += 1
+
+def _exit(key: str, start: Optional[float]):
+    end = time.perf_counter()
+    with _lock:
+        activity = _activity[key]
+        activity[0] -= 1
+        if activity[0] == 0:
+            activity[2] += end - activity[1]
+        if start is not None:
+            activity[3] += 1
+            _latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(end - start)
+
+def get_resilience_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-target counters of calls and of retries, hedges and circuit rejections.
+
+    ``retry_saves`` counts calls that succeeded only after a retry, ``hedge_wins``
+    calls answered by the hedged duplicate request and ``retry_budget_exhausted``
+    calls that failed because the target's retry budget was spent.
+    """
+    with _lock:
+        return {target: dict(counter) for target, counter in _stats.items()}
+
+def _status_code(error: Exception) -> Optional[int]:
+    if isinstance(error, ClientError):
+        return error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+def is_throttling_error(error: Exception) -> bool:
+    """Return whether an error signals throttling (AWS error codes or HTTP 429)."""
+    if isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+        return True
+    return _status_code(error) in THROTTLING_STATUS_CODES
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return whether an error is worth retrying: throttling, timeouts, dropped connections, 5xx."""
+    if is_throttling_error(error) or _status_code(error) in TRANSIENT_STATUS_CODES:
+        return True
+    if isinstance(error, (ReadTimeoutError, BotoConnectionError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        import requests
+        return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+    except ImportError:
+        return False
+
+def backoff_delay(attempt: int, throttled: bool, policy: Dict[str, Any]) -> float:
+    """Full-jitter exponential backoff; throttling backs off from a larger base."""
+    base = policy["throttle_base_delay_seconds"] if throttled else policy["base_delay_seconds"]
+    return random.uniform(0, min(policy["max_delay_seconds"], base * 2 ** attempt))
+
+def _hedge_delay(key: str, policy: Dict[str, Any]) -> Optional[float]:
+    with _lock:
+        samples = _attempt_latencies.get(key)
+        if not samples or len(samples) < policy["hedge_min_samples"]:
+            return None
+        return float(np.quantile(np.fromiter(samples, dtype=float), policy["hedge_quantile"]))
+
+def _call_hedged(target: str, func: Callable[[], Any], delay: float) -> Any:
+    """Run func; if it has not finished after ``delay`` seconds, race a duplicate request."""
+    primary = _executor.submit(contextvars.copy_context().run, func)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    _record(target, "hedges")
+    current_span().incr("hedges")
+    hedge = _executor.submit(contextvars.copy_context().run, func)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    _record(target, "hedge_wins")
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+def call_with_resilience(target: str, func: Callable[[], Any], latency_key: Optional[str] = None) -> Any:
+    """Call func under the target's circuit breaker, retry budget and hedging policy.
+
+    The breaker counts one failure per call, once its retries are exhausted;
+    throttling only backs off and never trips it. Latency and throughput are
+    recorded under ``latency_key`` (default: the target), so calls that
+    measure something else, such as opening a response stream, stay separate.
+    """
+    policy = get_policy(target)
+    breaker = _breaker(target, policy)
+    budget = _budget(target, policy)
+    key = latency_key or target
+    _record(target, "calls")
+    if not breaker.allow():
+        _record(target, "circuit_rejections")
+        raise CircuitOpenError(f"Circuit open for {target}; skipping call")
+    budget.deposit()
+
+    call_start = time.perf_counter()
+    succeeded = False
+    _enter(key)
+    try:
+        for attempt in range(policy["max_attempts"]):
+            delay = _hedge_delay(key, policy) if policy["hedge"] else None
+            start = time.perf_counter()
+            try:
+                result = _call_hedged(target, func, delay) if delay is not None else func()
+            except Exception as e:
+                if not is_retryable_error(e):
+                    # The target answered (e.g. validation error), so it is reachable
+                    breaker.record_success()
+                    raise
+                throttled = is_throttling_error(e)
+                exhausted = attempt == policy["max_attempts"] - 1
+                if not exhausted and not budget.withdraw():
+                    _record(target, "retry_budget_exhausted")
+                    exhausted = True
+                if exhausted:
+                    if throttled:
+                        breaker.release()
+                    else:
+                        breaker.record_failure()
+                    raise
+                _record(target, "throttled_retries" if throttled else "retries")
+                current_span().incr("retries")
+                logger.warning(f"Retrying {target} after {type(e).__name__} (attempt {attempt + 1})")
+                time.sleep(backoff_delay(attempt, throttled, policy))
+                continue
+
+            breaker.record_success()
+            succeeded = True
+            with _lock:
+                # Single-attempt latencies drive the hedge delay
+                _attempt_latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(time.perf_counter() - start)
+            if attempt > 0:
+                _record(target, "retry_saves")
+            return result
+    finally:
+        _exit(key, call_start if succeeded else None)
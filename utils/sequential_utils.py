@@ -0,0 +1,111 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def stratified_order(
+    cases: List[Dict[str, Any]],
+    stratify_by: Optional[str] = None,
+    seed: int = 0
+) -> List[int]:
+    """Return a randomized case order that interleaves strata proportionally.
+
+    Cases are shuffled within each stratum and each case gets the sort key
+    (rank + U) / stratum_size, so every prefix of the order is close to the
+    suite's stratum mix.
+    """
+    rng = np.random.default_rng(seed)
+    strata: Dict[Any, List[int]] = {}
+    for i, case in enumerate(cases):
+        strata.setdefault(case.get(stratify_by) if stratify_by else None, []).append(i)
+
+    keys = np.empty(len(cases))
+    for members in strata.values():
+        shuffled = rng.permutation(members)
+        keys[shuffled] = (np.arange(len(members)) + rng.random(len(members))) / len(members)
+    return [int(i) for i in np.argsort(keys, kind="stable")]
+
+def confidence_radius(n: int, total: int, error_rate: float, look: int) -> float:
+    """Serfling-Hoeffding radius for a mean of [0, 1] scores sampled without replacement.
+
+    The error rate is split across looks as error_rate / (look * (look + 1)),
+    which sums to error_rate, so the bound stays valid under repeated peeking.
+    """
+    if n >= total:
+        return 0.0
+    alpha = error_rate / (look * (look + 1))
+    finite_population = 1.0 - (n - 1) / total
+    return math.sqrt(finite_population * math.log(2.0 / alpha) / (2.0 * n))
+
+def evaluate_sequentially(
+    cases: List[Dict[str, Any]],
+    evaluate_fn: Callable[[Dict[str, Any]], float],
+    threshold: float,
+    direction: str = "min",
+    error_rate: float = 0.05,
+    batch_size: int = 10,
+    stratify_by: Optional[str] = None,
+    seed: int = 0,
+    exhaustive: bool = False
+) -> Dict[str, Any]:
+    """Evaluate cases in batches until the threshold decision is settled.
+
+    ``evaluate_fn`` maps a case to a score in [0, 1] (a bool pass/fail works too).
+    With ``direction="min"`` the suite passes when the mean score is at least
+    ``threshold``; with ``"max"`` when it is at most ``threshold``. Evaluation
+    stops once the confidence interval excludes the threshold at ``error_rate``,
+    or covers every case when ``exhaustive`` is set.
+    """
+    try:
+        if direction not in ("min", "max"):
+            raise ValueError(f"Unknown direction '{direction}'; expected 'min' or 'max'")
+
+        total = len(cases)
+        order = stratified_order(cases, stratify_by, seed)
+        scores: List[float] = []
+        lower, upper, look = 0.0, 1.0, 0
+
+        for start in range(0, total, batch_size):
+            for i in order[start:start + batch_size]:
+                scores.append(float(evaluate_fn(cases[i])))
+            look += 1
+
+            estimate = float(np.mean(scores))
+            radius = confidence_radius(len(scores), total, error_rate, look)
+            lower, upper = max(estimate - radius, 0.0), min(estimate + radius, 1.0)
+            if not exhaustive and (lower > threshold or upper < threshold):
+                break
+
+        estimate = float(np.mean(scores)) if scores else 0.0
+        passed = estimate >= threshold if direction == "min" else estimate <= threshold
+        results = {
+            "estimate": estimate,
+            "lower": lower,
+            "upper": upper,
+            "threshold": threshold,
+            "passed": passed,
+            "evaluated": len(scores),
+            "total": total,
+            "stopped_early": len(scores) < total,
+            "scores": scores
+        }
+        logger.info(
+            f"Sequential evaluation: {len(scores)}/{total} cases, estimate={estimate:.3f} "
+            f"[{lower:.3f}, {upper:.3f}], passed={passed}"
+        )
+        return results
+    except Exception as e:
+        logger.error(f"Sequential evaluation failed: {str(e)}")
+        raise
@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import json
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def latency_percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 latency in milliseconds for samples in seconds."""
+    p50, p95, p99 = np.percentile(np.asarray(samples, dtype=float) * 1000.0, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+def average_ranks(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return 1-based ranks with ties averaged, plus the size of each tie group."""
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind="mergesort")] = np.arange(1, len(values) + 1)
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    return (np.bincount(inverse, weights=ranks) / counts)[inverse], counts
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """One-sided Mann-Whitney U p-value that current latencies are larger than baseline.
+
+    Uses the tie-corrected normal approximation with continuity correction.
+    """
+    x = np.asarray(current, dtype=float)
+    y = np.asarray(baseline, dtype=float)
+    n1, n2 = len(x), len(y)
+    n = n1 + n2
+    ranks, counts = average_ranks(np.concatenate([x, y]))
+
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+    tie_term = float(np.sum(counts ** 3 - counts)) / (n * (n - 1))
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+def load_baseline(path: str) -> Dict[str, List[List[float]]]:
+    """Load per-target latency samples from previous runs (oldest first)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def update_baseline(
+    path: str,
+    baseline: Dict[str, List[List[float]]],
+    samples: Dict[str, List[float]],
+    max_runs: int = 10
+):
+    """Append this run's samples to the rolling baseline and save it."""
+    try:
+        for target, latencies in samples.items():
+            runs = baseline.setdefault(target, [])
+            runs.append([round(s, 6) for s in latencies])
+            del runs[:-max_runs]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(baseline, f)
+        logger.info(f"SLO baseline updated at {path}")
+    except Exception as e:
+        logger.error(f"Failed to update SLO baseline: {str(e)}")
+        raise
+
+def evaluate_slos(
+    samples: Dict[str, List[float]],
+    slo_targets: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, List[List[float]]]] = None,
+    throughput: Optional[Dict[str, float]] = None,
+    significance: float = 0.01,
+    min_slowdown: float = 0.1,
+    min_samples: int = 5
+) -> Dict[str, Dict[str, Any]]:
+    """Check latency samples against per-target SLOs and the rolling baseline.
+
+    A target regresses when its latencies are significantly larger than the
+    baseline's (one-sided Mann-Whitney at ``significance``) and its median is
+    at least ``min_slowdown`` slower. Targets with fewer than ``min_samples``
+    samples are reported but not judged.
+    """
+    try:
+        baseline = baseline or {}
+        throughput = throughput or {}
+        results = {}
+        for target, slo in slo_targets.items():
+            latencies = samples.get(target, [])
+            result: Dict[str, Any] = {"samples": len(latencies)}
+            if len(latencies) < min_samples:
+                result["passed"] = True
+                result["skipped"] = True
+                results[target] = result
+                continue
+
+            result.update(latency_percentiles(latencies))
+            checks = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if key in slo:
+                    result[f"{key}_pass"] = result[key] <= slo[key]
+                    checks.append(result[f"{key}_pass"])
+            if "min_throughput_rps" in slo and target in throughput:
+                result["throughput_rps"] = throughput[target]
+                result["throughput_pass"] = throughput[target] >= slo["min_throughput_rps"]
+                checks.append(result["throughput_pass"])
+
+            history = [s for run in baseline.get(target, []) for s in run]
+            if len(history) >= min_samples:
+                p_value = mann_whitney_greater(latencies, history)
+                slowdown = float(np.median(latencies) / np.median(history)) - 1.0
+                result["baseline_p_value"] = p_value
+                result["baseline_slowdown"] = slowdown
+                result["regression"] = p_value < significance and slowdown >= min_slowdown
+                checks.append(not result["regression"])
+
+            result["passed"] = all(checks)
+            results[target] = result
+
+        failed = [target for target, result in results.items() if not result["passed"]]
+        if failed:
+            logger.error(f"SLO violations for {failed}")
+        else:
+            logger.info(f"All SLOs met for {len(results)} targets")
+        return results
+    except Exception as e:
+        logger.error(f"SLO evaluation failed: {str(e)}")
+        raise
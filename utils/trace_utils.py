@@ -0,0 +1,169 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# © 2025 Mahesh Mutukula. All rights reserved.
+# This file is part of the GenAI QA Eval Framework.
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_events: List[Dict[str, Any]] = []
+_current = contextvars.ContextVar("current_span", default=None)
+_profiler: Optional["SamplingProfiler"] = None
+
+class Span:
+    """A timed region with attributes such as payload bytes, retries and cache hits."""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes: Any):
+        """Set span attributes."""
+        self.attributes.update(attributes)
+
+    def incr(self, key: str, amount: int = 1):
+        """Increment a counter attribute (e.g. retries, cache_hits)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+class _NullSpan(Span):
+    """Span returned while tracing is disabled; all updates are no-ops."""
+
+    def __init__(self):
+        super().__init__("", {})
+
+    def set(self, **attributes: Any):
+        pass
+
+    def incr(self, key: str, amount: int = 1):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def current_span() -> Span:
+    """Return the innermost active span, or a no-op span when tracing is off."""
+    return _current.get() or _NULL_SPAN
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Record a span as a Chrome trace complete event."""
+    if not _enabled:
+        yield _NULL_SPAN
+        return
+    active = Span(name, attributes)
+    token = _current.set(active)
+    start = time.perf_counter()
+    try:
+        yield active
+    except Exception as e:
+        active.set(error=type(e).__name__)
+        raise
+    finally:
+        end = time.perf_counter()
+        _current.reset(token)
+        _events.append({
+            "name": name,
+            "cat": "utils",
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": active.attributes
+        })
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorate a function so each call is recorded as a span when tracing is enabled."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class SamplingProfiler:
+    """Background thread that samples all thread stacks into folded-stack counts."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, output_path: str):
+        """Write samples in folded format (flamegraph.pl, speedscope)."""
+        with open(output_path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+def configure_tracing(enabled: bool = False, profile: bool = False, profile_interval: float = 0.005):
+    """Enable or disable span tracing and the optional sampling profiler."""
+    global _enabled, _profiler
+    _enabled = enabled
+    if enabled and profile and _profiler is None:
+        _profiler = SamplingProfiler(profile_interval)
+        _profiler.start()
+    logger.info(f"Tracing {'enabled' if enabled else 'disabled'} (profiler: {_profiler is not None})")
+
+def write_trace(output_path: str) -> Optional[str]:
+    """Write recorded spans as a Chrome trace (Perfetto / chrome://tracing).
+
+    Profiler samples, if any, go next to it with a ``.folded`` suffix.
+    """
+    global _profiler
+    try:
+        if not _events and _profiler is None:
+            return None
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, default=str)
+        if _profiler is not None:
+            _profiler.stop()
+            _profiler.write(os.path.splitext(output_path)[0] + ".folded")
+            _profiler = None
+        logger.info(f"Trace with {len(_events)} spans saved to {output_path}")
+        return output_path
+    except Exception as e:
+        logger.error(f"Failed to write trace: {str(e)}")
+        raise